@@ -0,0 +1,138 @@
+# batch_check.py
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from models.findings import to_columns, columns_to_json
+from models.registry import registry
+
+MODEL_KEYS = {
+    'rule-based': 'Rule-based',
+    'ml': 'ML'
+}
+
+_worker_models = {}
+
+
+def _init_worker(model_names):
+    # Runs once per worker process so every model is loaded (or memory-mapped) only once
+    for model_name in model_names:
+        _worker_models[model_name] = registry.get(model_name)
+
+
+def _check_batch(docs):
+    # docs: list of (doc_id, text); returns one JSON line per document, in order
+    texts = [text for _, text in docs]
+    results = {}
+    for model_name, model in _worker_models.items():
+        if model_name == 'Rule-based':
+            results[model_name] = [
+                {'findings': columns_to_json(to_columns(corrections)), 'corrected': corrected}
+                for corrections, corrected in model.check_texts(texts)
+            ]
+        else:
+            results[model_name] = [{'findings': columns_to_json(to_columns(findings))} for findings in model.check_texts(texts)]
+
+    lines = []
+    for i, (doc_id, _) in enumerate(docs):
+        record = {'id': doc_id}
+        for model_name in _worker_models:
+            record[model_name] = results[model_name][i]
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def read_docs(stream, input_format, text_field):
+    # Yields (doc_id, text) one line at a time, so the input is never held in memory
+    for line_number, line in enumerate(stream, 1):
+        line = line.rstrip('\n')
+        if not line.strip():
+            continue
+        if input_format == 'jsonl':
+            record = json.loads(line)
+            yield record.get('id', line_number), record[text_field]
+        else:
+            yield line_number, line
+
+
+def iter_batches(docs, batch_size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(docs, output, model_names, workers, batch_size, max_pending, progress_every=10.0):
+    start = time.perf_counter()
+    last_report = start
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_names,)) as executor:
+        # At most max_pending batches are in flight, which bounds memory; results are written in input order
+        pending = deque()
+
+        def drain(limit):
+            nonlocal done, last_report
+            while len(pending) > limit:
+                future, size = pending.popleft()
+                for line in future.result():
+                    output.write(line + '\n')
+                done += size
+                now = time.perf_counter()
+                if progress_every and now - last_report >= progress_every:
+                    print(f"{done} docs, {done / (now - start):.1f} docs/sec", file=sys.stderr)
+                    last_report = now
+
+        for batch in iter_batches(docs, batch_size):
+            pending.append((executor.submit(_check_batch, batch), len(batch)))
+            drain(max_pending)
+        drain(0)
+
+    elapsed = time.perf_counter() - start
+    return done, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a text or JSONL corpus with the rule-based and ML checkers.")
+    parser.add_argument('input', help="Input file, one document per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output JSONL file ('-' for stdout)")
+    parser.add_argument('--format', choices=['auto', 'text', 'jsonl'], default='auto', help="Input format")
+    parser.add_argument('--text-field', default='text', help="Field holding the text in JSONL input")
+    parser.add_argument('--models', nargs='+', choices=sorted(MODEL_KEYS), default=['rule-based', 'ml'])
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=256, help="Documents per task")
+    parser.add_argument('--max-pending', type=int, default=None, help="Tasks in flight (default: 2 per worker)")
+    args = parser.parse_args()
+
+    input_format = args.format
+    if input_format == 'auto':
+        input_format = 'jsonl' if args.input.endswith(('.jsonl', '.json')) else 'text'
+
+    model_names = [MODEL_KEYS[key] for key in args.models]
+    workers = args.workers or None
+    max_pending = args.max_pending or 2 * (workers or os.cpu_count() or 1)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        docs = read_docs(source, input_format, args.text_field)
+        done, elapsed = run(docs, output, model_names, workers, args.batch_size, max_pending)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Checked {done} docs in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} docs/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
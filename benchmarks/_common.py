@@ -0,0 +1,29 @@
+import os
+import resource
+import time
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def memory_mb():
+    # Resident and shared (file-backed) memory; mmap'd pages count as shared
+    with open('/proc/self/statm') as f:
+        fields = f.read().split()
+    page_mb = os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    return int(fields[1]) * page_mb, int(fields[2]) * page_mb
+
+
+def timed_ms(func, *args, repeat=1):
+    # Mean wall time of one call
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) * 1000 / repeat
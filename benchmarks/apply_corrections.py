@@ -0,0 +1,67 @@
+import argparse
+import json
+import random
+
+from models.findings import Finding
+from models.rule_based_model import RuleBasedChecker
+from benchmarks._common import timed_ms
+from benchmarks.synthetic import synthetic_vocab
+
+
+def synthetic_document(rng, n_words, n_findings, vocab):
+    # A long text and spelling fixes for n_findings randomly chosen words, with their offsets
+    words = [rng.choice(vocab) for _ in range(n_words)]
+    text = ' '.join(words)
+    starts = []
+    position = 0
+    for word in words:
+        starts.append(position)
+        position += len(word) + 1
+    corrections = []
+    for i in sorted(rng.sample(range(n_words), n_findings)):
+        corrections.append(Finding('spelling', 'Synthetic fix', starts[i], starts[i] + len(words[i]), words[i] + 'ு', text))
+    return text, corrections
+
+
+def legacy_apply(text, corrections):
+    # The previous implementation: a whole-string replace per correction
+    corrected_text = text
+    for _, _, original, correction, *_ in corrections:
+        if correction:
+            corrected_text = corrected_text.replace(original, correction)
+    return corrected_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare replace-per-correction with the single-pass span-based apply.")
+    parser.add_argument('--words', type=int, nargs='+', default=[1000, 10000, 100000], help="Words per document")
+    parser.add_argument('--findings-per-1000-words', type=int, default=50)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocab = synthetic_vocab(5000, rng)
+    checker = RuleBasedChecker()
+
+    results = []
+    for n_words in args.words:
+        n_findings = max(1, n_words * args.findings_per_1000_words // 1000)
+        text, corrections = synthetic_document(rng, n_words, n_findings, vocab)
+        row = {
+            'words': n_words,
+            'chars': len(text),
+            'findings': n_findings,
+            'legacy_ms': round(timed_ms(legacy_apply, text, corrections), 2),
+            'span_pass_ms': round(timed_ms(checker.apply_corrections, text, corrections), 2),
+        }
+        row['speedup'] = round(row['legacy_ms'] / row['span_pass_ms'], 1)
+        results.append(row)
+        print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
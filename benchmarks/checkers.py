@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks._common import percentile, peak_rss_mb
+from benchmarks.synthetic import VOWEL_SIGNS
+
+CHECKERS = ['Rule-based', 'ML', 'Deep-Learning']
+
+# Sentence shapes as POS sequences; None takes any lexicon word
+TEMPLATES = [
+    ['pronoun', 'noun', 'verb'],
+    ['pronoun', 'adjective', 'noun', 'verb'],
+    ['noun', 'common', 'noun', 'verb'],
+    ['pronoun', 'noun', 'common', None, 'verb'],
+]
+
+
+def _words_by_pos():
+    from models.lexicon import Lexicon
+    lexicon = Lexicon.load_or_compile()
+    groups = {None: []}
+    for word in lexicon:
+        groups.setdefault(lexicon.get(word), []).append(word)
+        groups[None].append(word)
+    return groups
+
+
+def _misspell(word, rng):
+    # Swap the last vowel sign (or add one) to imitate a common Tamil typo
+    if word and word[-1] in VOWEL_SIGNS:
+        return word[:-1] + rng.choice([sign for sign in VOWEL_SIGNS if sign != word[-1]])
+    return word + rng.choice(VOWEL_SIGNS[1:])
+
+
+def synthetic_corpus(size, seed=0, error_rate=0.2, max_sentences=3):
+    # Documents of 1..max_sentences template sentences from the lexicon, with injected misspellings
+    rng = random.Random(seed)
+    groups = _words_by_pos()
+    docs = []
+    for _ in range(size):
+        sentences = []
+        for _ in range(rng.randint(1, max_sentences)):
+            words = [rng.choice(groups.get(pos) or groups[None]) for pos in rng.choice(TEMPLATES)]
+            words = [_misspell(word, rng) if rng.random() < error_rate else word for word in words]
+            sentences.append(' '.join(words))
+        docs.append('. '.join(sentences))
+    return docs
+
+
+def _build(checker_name, stub_latency):
+    if checker_name != 'Deep-Learning':
+        from models.registry import registry
+        return registry.get(checker_name), None
+
+    # The LLM checker talks to a local stub; caching is off so every text costs a request
+    from benchmarks.groq_stub_server import start_server
+    from models.deep_Learning_model import GemmaChecker
+    from models.llm_cache import ResponseCache
+    server, base_url = start_server(latency=stub_latency)
+    os.environ.setdefault('GROQ_API_KEY', 'stub')
+    checker = GemmaChecker(
+        cache=ResponseCache(path=None, memory_entries=0),
+        base_url=base_url,
+        requests_per_minute=10 ** 6,
+        tokens_per_minute=10 ** 9,
+        max_retries=0
+    )
+    return checker, server
+
+
+def _flags(checker_name, checker, text):
+    findings = checker.check_text(text)
+    # Rule-based returns (findings, corrected text)
+    return bool(findings[0] if checker_name == 'Rule-based' else findings)
+
+
+def _accuracy(checker_name, checker):
+    # Scored against test_samples.test_cases: every text contains at least one error and every
+    # expected_correction is clean, so a checker that flags everything is caught by its false positives
+    from test_samples import test_cases
+    false_positive_rate = sum(_flags(checker_name, checker, case['expected_correction']) for case in test_cases) / len(test_cases)
+    if checker_name == 'Rule-based':
+        exact = 0
+        tokens = matched = 0
+        for case in test_cases:
+            _, corrected = checker.check_text(case['text'])
+            expected = case['expected_correction']
+            exact += corrected == expected
+            got, want = corrected.split(), expected.split()
+            tokens += len(want)
+            matched += sum(a == b for a, b in zip(got, want))
+        return {'cases': len(test_cases), 'exact_match': exact / len(test_cases), 'token_accuracy': matched / tokens,
+                'false_positive_rate': false_positive_rate}
+    if checker_name == 'ML':
+        detection_rate = sum(_flags(checker_name, checker, case['text']) for case in test_cases) / len(test_cases)
+        return {'cases': len(test_cases), 'detection_rate': detection_rate, 'false_positive_rate': false_positive_rate,
+                'balanced_accuracy': (detection_rate + 1 - false_positive_rate) / 2}
+    # A stubbed LLM says nothing about real accuracy
+    return None
+
+
+def run_worker(checker_name, corpus_path, latency_samples, stub_latency):
+    with open(corpus_path, encoding='utf-8') as f:
+        docs = json.load(f)
+    baseline_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    checker, server = _build(checker_name, stub_latency)
+    startup = time.perf_counter() - start
+    startup_rss = peak_rss_mb()
+
+    latencies = []
+    for text in docs[:latency_samples]:
+        start = time.perf_counter()
+        checker.check_text(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    checker.check_texts(docs)
+    batch_seconds = time.perf_counter() - start
+
+    result = {
+        'startup_seconds': round(startup, 4),
+        'latency_p50_ms': round(percentile(latencies, 0.5), 3),
+        'latency_p99_ms': round(percentile(latencies, 0.99), 3),
+        'throughput_docs_per_sec': round(len(docs) / batch_seconds, 1),
+        'startup_rss_mb': round(startup_rss - baseline_rss, 1),
+        'peak_rss_mb': round(peak_rss_mb() - baseline_rss, 1),
+        'accuracy': _accuracy(checker_name, checker),
+    }
+    if server is not None:
+        server.shutdown()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Metrics compared against a baseline run, and whether higher is better
+COMPARED_METRICS = {
+    'startup_seconds': False,
+    'latency_p50_ms': False,
+    'latency_p99_ms': False,
+    'throughput_docs_per_sec': True,
+    'peak_rss_mb': False,
+}
+# Scores under 'accuracy', and whether higher is better; they are fractions, so compared by absolute change
+COMPARED_ACCURACY = {
+    'exact_match': True,
+    'token_accuracy': True,
+    'detection_rate': True,
+    'false_positive_rate': False,
+    'balanced_accuracy': True,
+}
+
+
+def compare(results, baseline, tolerance, accuracy_tolerance=0.0):
+    # Returns a line per metric that got worse than the baseline: performance metrics by more than
+    # tolerance (a fraction of the old value), accuracy scores by more than accuracy_tolerance (absolute)
+    previous = {(row['checker'], row['docs']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['checker'], row['docs']))
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), row.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{row['checker']} @ {row['docs']} docs: {metric} {old} -> {new} ({change:+.0%})")
+        for metric, higher_is_better in COMPARED_ACCURACY.items():
+            old, new = (before.get('accuracy') or {}).get(metric), (row.get('accuracy') or {}).get(metric)
+            if old is None or new is None:
+                continue
+            change = new - old
+            if (-change if higher_is_better else change) > accuracy_tolerance:
+                regressions.append(f"{row['checker']} @ {row['docs']} docs: {metric} {old:.3f} -> {new:.3f} ({change:+.3f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure latency, throughput, memory, startup time and accuracy of each checker.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="Documents per corpus")
+    parser.add_argument('--checkers', nargs='+', choices=CHECKERS, default=CHECKERS)
+    parser.add_argument('--latency-samples', type=int, default=500, help="Documents timed one at a time per run")
+    parser.add_argument('--llm-max-docs', type=int, default=1000, help="Largest corpus sent to the stubbed LLM")
+    parser.add_argument('--stub-latency', type=float, default=0.02, help="Seconds per stubbed LLM completion")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="Results JSON from an earlier commit to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.0, help="Allowed absolute drop in an accuracy score")
+    parser.add_argument('--worker', nargs=2, metavar=('CHECKER', 'CORPUS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker[0], args.worker[1], args.latency_samples, args.stub_latency)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Build lexicon, spelling index and trained model artifacts first so startup times are warm loads
+        for checker_name in args.checkers:
+            if checker_name != 'Deep-Learning':
+                subprocess.run([sys.executable, '-c', f'from models.registry import registry; registry.get({checker_name!r})'],
+                               check=True, capture_output=True)
+
+        for size in args.sizes:
+            path = os.path.join(tmp_dir, f'corpus-{size}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(synthetic_corpus(size, args.seed), f, ensure_ascii=False)
+
+            for checker_name in args.checkers:
+                if checker_name == 'Deep-Learning' and size > args.llm_max_docs:
+                    continue
+                # A fresh process per run so startup time and peak memory belong to one checker
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.checkers', '--latency-samples', str(args.latency_samples),
+                     '--stub-latency', str(args.stub_latency), '--worker', checker_name, path],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                row = {'checker': checker_name, 'docs': size}
+                row.update(json.loads(output.strip().splitlines()[-1]))
+                results.append(row)
+                print(json.dumps(row, ensure_ascii=False))
+
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.accuracy_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stand-in for Groq's OpenAI-compatible chat-completions endpoint, for offline runs
+COMPLETIONS_PATH = '/openai/v1/chat/completions'
+
+
+class StubState:
+    def __init__(self, latency=0.05, error_rate=0.0, rate_limit_every=0, reply=None, chunk_delay=0.01):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.rate_limit_every = rate_limit_every
+        self.reply = reply
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def make_completion(model, content, prompt_chars):
+    completion_tokens = max(1, len(content) // 2)
+    prompt_tokens = max(1, prompt_chars // 2)
+    return {
+        'id': f'chatcmpl-stub-{random.getrandbits(32):08x}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens}
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model, content, chunk_delay):
+        # Server-sent events in the OpenAI chunk format, a few words per chunk
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        completion_id = f'chatcmpl-stub-{random.getrandbits(32):08x}'
+        words = content.split(' ')
+        pieces = [' '.join(words[i:i + 3]) + (' ' if i + 3 < len(words) else '') for i in range(0, len(words), 3)]
+        for index, piece in enumerate(pieces + [None]):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': piece} if piece is not None else {},
+                    'finish_reason': None if piece is not None else 'stop'
+                }]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            if piece is not None and index:
+                time.sleep(chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def do_POST(self):
+        state = self.server.state
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        with state.lock:
+            state.requests += 1
+            count = state.requests
+
+        if state.rate_limit_every and count % state.rate_limit_every == 0:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'tokens', 'code': 'rate_limit_exceeded'}},
+                            {'Retry-After': '0.1'})
+            return
+        if random.random() < state.error_rate:
+            self._send_json(503, {'error': {'message': 'Service unavailable', 'type': 'server_error'}})
+            return
+
+        time.sleep(state.latency)
+        messages = request.get('messages', [])
+        text = messages[-1]['content'] if messages else ''
+        content = state.reply if state.reply is not None else f"திருத்தப்பட்ட உரை: {text.strip()}"
+        if request.get('stream'):
+            self._send_stream(request.get('model', 'stub'), content, state.chunk_delay)
+            return
+        self._send_json(200, make_completion(request.get('model', 'stub'), content, sum(len(m['content']) for m in messages)))
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    # Returns (server, base_url); the server runs on a daemon thread until server.shutdown()
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Groq chat-completions API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per completion")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="Answer every Nth request with 429")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                                    rate_limit_every=args.rate_limit_every)
+    print(f"Serving on {base_url} (set GROQ_BASE_URL={base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package" lines; nesting is shown by indentation
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip())))
+    return modules
+
+
+def measure(module, repeat):
+    # Best of repeat fresh interpreters; returns (cumulative ms, every module imported on the way)
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        modules = parse_importtime(result.stderr)
+        total = next(cumulative for name, _, cumulative, depth in reversed(modules) if name == module and depth == 1)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best[0] / 1000, best[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per entry point and check it against the budget.")
+    parser.add_argument('--budget', default=BUDGET_PATH, help="JSON with max_ms and forbidden imports per module")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument('--top', type=int, default=5, help="Slowest imported modules listed per entry point")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    results = []
+    violations = []
+    for module, limits in budget.items():
+        total_ms, modules = measure(module, args.repeat)
+        imported = {name.split('.')[0] for name, _, _, _ in modules}
+        forbidden = sorted(imported & set(limits.get('forbidden', [])))
+        slowest = sorted(modules, key=lambda m: -m[1])[:args.top]
+        row = {
+            'module': module,
+            'import_ms': round(total_ms, 1),
+            'budget_ms': limits.get('max_ms'),
+            'modules_imported': len(modules),
+            'forbidden_imported': forbidden,
+            'slowest_self_ms': {name: round(self_us / 1000, 1) for name, self_us, _, _ in slowest},
+        }
+        results.append(row)
+        print(json.dumps(row))
+
+        if limits.get('max_ms') is not None and total_ms > limits['max_ms']:
+            violations.append(f"{module}: {total_ms:.1f} ms > {limits['max_ms']} ms")
+        if forbidden:
+            violations.append(f"{module}: imports {', '.join(forbidden)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0], 'results': results},
+                      f, indent=2)
+
+    for line in violations:
+        print(f"OVER BUDGET {line}", file=sys.stderr)
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from models.lexicon import Lexicon, compile_lexicon
+from benchmarks._common import memory_mb
+from benchmarks.synthetic import synthetic_word
+
+POS_TAGS = ['noun', 'verb', 'adjective', 'pronoun', None]
+
+
+def synthetic_words(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield synthetic_word(rng, 2, 7), rng.choice(POS_TAGS)
+
+
+def run_worker(path, n_lookups):
+    rss_before, shared_before = memory_mb()
+    start = time.perf_counter()
+    lexicon = Lexicon(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    queries = [word for word, _ in synthetic_words(n_lookups, seed=1)]
+    start = time.perf_counter()
+    for word in queries:
+        lexicon.get(word)
+    lookup_us = (time.perf_counter() - start) * 1e6 / n_lookups
+
+    start = time.perf_counter()
+    for word in queries[:1000]:
+        lexicon.words_with_prefix(word[:2], limit=10)
+    prefix_us = (time.perf_counter() - start) * 1e6 / 1000
+
+    rss_after, shared_after = memory_mb()
+    return {
+        'load_ms': round(load_ms, 3),
+        'lookup_us': round(lookup_us, 2),
+        'prefix_query_us': round(prefix_us, 2),
+        'private_delta_mb': round((rss_after - shared_after) - (rss_before - shared_before), 2),
+        'shared_delta_mb': round(shared_after - shared_before, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure lexicon load time, lookup cost and memory as the word count grows.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000, 3000000], help="Number of words")
+    parser.add_argument('--lookups', type=int, default=20000, help="Lookups timed per size")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--worker', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.lookups)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            path = os.path.join(tmp_dir, f'lexicon-{size}.bin')
+            start = time.perf_counter()
+            compile_lexicon(synthetic_words(size), path)
+            compile_seconds = time.perf_counter() - start
+
+            # A fresh process per size so the measurements do not include the compile step
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.lexicon', '--lookups', str(args.lookups), '--worker', path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            row = {'words': len(Lexicon(path)), 'file_mb': round(os.path.getsize(path) / 2 ** 20, 1),
+                   'compile_seconds': round(compile_seconds, 2)}
+            row.update(json.loads(output))
+            results.append(row)
+            print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from models.ngram_lm import NgramLanguageModel, compile_language_model
+from models.spell_index import SpellingIndex
+from benchmarks._common import memory_mb
+from benchmarks.checkers import synthetic_corpus, _misspell
+from benchmarks.synthetic import synthetic_vocab
+
+EDIT_LOG10 = -2.0
+
+
+def write_corpus(path, n_docs, seed, vocab_size):
+    # Clean synthetic documents, one per line. With vocab_size the words are drawn from a Zipfian
+    # synthetic vocabulary, which reaches millions of n-grams; otherwise from the lexicon templates
+    if not vocab_size:
+        with open(path, 'w', encoding='utf-8') as f:
+            for doc in synthetic_corpus(n_docs, seed=seed, error_rate=0.0):
+                f.write(doc + '.\n')
+        return
+
+    rng = random.Random(seed)
+    vocab = synthetic_vocab(vocab_size, rng, 2, 6)
+    rng.shuffle(vocab)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, vocab_size + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(n_docs):
+            sentences = [' '.join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(3, 8)))
+                         for _ in range(rng.randint(1, 3))]
+            f.write('. '.join(sentences) + '.\n')
+
+
+def run_worker(path, corpus_path, n_queries):
+    rss_before, shared_before = memory_mb()
+    start = time.perf_counter()
+    model = NgramLanguageModel(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    with open(corpus_path, encoding='utf-8') as f:
+        sentences = [line.strip() for _, line in zip(range(n_queries), f)]
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    for sentence in sentences:
+        model.score(sentence)
+    score_us = (time.perf_counter() - start) * 1e6 / len(sentences)
+
+    windows = []
+    for sentence in sentences:
+        words = sentence.rstrip('.').split('. ')[0].split()
+        i = rng.randrange(len(words))
+        candidates = [words[i]] + [_misspell(words[i], rng) for _ in range(4)]
+        windows.append((words[max(0, i - 2):i], candidates, words[i + 1:i + 3]))
+    start = time.perf_counter()
+    for left, candidates, right in windows:
+        model.rank_candidates(left, candidates, right)
+    rank_us = (time.perf_counter() - start) * 1e6 / len(windows)
+
+    rss_after, shared_after = memory_mb()
+    return {
+        'load_ms': round(load_ms, 3),
+        'score_sentence_us': round(score_us, 1),
+        'rank_5_candidates_us': round(rank_us, 1),
+        'private_delta_mb': round((rss_after - shared_after) - (rss_before - shared_before), 2),
+        'shared_delta_mb': round(shared_after - shared_before, 2),
+    }
+
+
+def correction_accuracy(model, corpus_path, n_queries):
+    # Misspell one word per sentence; how often is the original the top candidate by edit distance
+    # alone versus edit distance plus language model context
+    vocab = set()
+    sentences = []
+    with open(corpus_path, encoding='utf-8') as f:
+        for line in f:
+            words = line.strip().rstrip('.').split('. ')[0].split()
+            vocab.update(words)
+            if len(sentences) < n_queries:
+                sentences.append(words)
+    index = SpellingIndex.from_words(vocab, max_distance=2)
+
+    rng = random.Random(2)
+    hits = {'distance_only': 0, 'with_language_model': 0}
+    for words in sentences:
+        i = rng.randrange(len(words))
+        suggestions = index.suggest(_misspell(words[i], rng), top_k=5)
+        if not suggestions:
+            continue
+        hits['distance_only'] += suggestions[0][0] == words[i]
+        distances = dict(suggestions)
+        ranked = model.rank_candidates(words[max(0, i - 2):i], distances, words[i + 1:i + 3])
+        best = max(ranked, key=lambda item: item[1] + distances[item[0]] * EDIT_LOG10)[0]
+        hits['with_language_model'] += best == words[i]
+    return {name: round(count / len(sentences), 3) for name, count in hits.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure n-gram model size, load time, scoring latency and memory as the corpus grows.")
+    parser.add_argument('--docs', type=int, nargs='+', default=[10000, 100000, 300000], help="Synthetic documents in the training corpus")
+    parser.add_argument('--vocab', type=int, default=50000, help="Synthetic vocabulary size; 0 uses the lexicon sentence templates")
+    parser.add_argument('--order', type=int, default=3)
+    parser.add_argument('--units', choices=['word', 'morpheme'], default='word')
+    parser.add_argument('--queries', type=int, default=5000, help="Sentences scored per size")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--worker', nargs=2, metavar=('MODEL', 'CORPUS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(*args.worker, args.queries)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_docs in args.docs:
+            corpus_path = os.path.join(tmp_dir, f'corpus-{n_docs}.txt')
+            model_path = os.path.join(tmp_dir, f'lm-{n_docs}.bin')
+            write_corpus(corpus_path, n_docs, n_docs, args.vocab)
+            start = time.perf_counter()
+            compile_language_model([corpus_path], model_path, args.order, args.units)
+            compile_seconds = time.perf_counter() - start
+
+            model = NgramLanguageModel(model_path)
+            ngrams = sum(model.ngram_counts.values())
+            row = {
+                'docs': n_docs,
+                'ngrams': model.ngram_counts,
+                'compile_s': round(compile_seconds, 2),
+                'file_mb': round(model.size_bytes() / 2 ** 20, 2),
+                'mb_per_million_ngrams': round(model.size_bytes() / 2 ** 20 / ngrams * 1e6, 2),
+            }
+            row.update(correction_accuracy(model, corpus_path, min(args.queries, 2000)))
+
+            # A fresh process per size so the measurements do not include the compile step
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.ngram_lm', '--queries', str(args.queries),
+                 '--worker', model_path, corpus_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            row.update(json.loads(output))
+            results.append(row)
+            print(json.dumps(row, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import pickle
+import random
+import tempfile
+import time
+
+from models.ML_model import StatisticalChecker, OnlineStatisticalChecker
+from models.registry import ModelRegistry
+from benchmarks.checkers import synthetic_corpus, _misspell
+
+
+def labeled_stream(n_docs, seed):
+    # Each clean synthetic document (label 1) followed by a copy with one misspelled word (label 0)
+    rng = random.Random(seed)
+    for doc in synthetic_corpus(n_docs, seed=seed, error_rate=0.0):
+        yield doc, 1, 1
+        words = doc.split()
+        i = rng.randrange(len(words))
+        words[i] = _misspell(words[i], rng)
+        yield ' '.join(words), 0, 0
+
+
+def model_bytes(checker):
+    return len(pickle.dumps((checker.spelling_model, checker.grammar_model), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def accuracy(checker, examples):
+    texts, spelling_labels, _ = zip(*examples)
+    features = checker._extract_features_batch(list(texts))
+    predictions = checker.spelling_model.predict(features)
+    return round(sum(int(p == label) for p, label in zip(predictions, spelling_labels)) / len(texts), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-batch online training with refitting the batch model on all data.")
+    parser.add_argument('--batches', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--report-every', type=int, default=20, help="Batches between reported rows")
+    parser.add_argument('--refit-max', type=int, default=8192, help="Largest dataset the full refit is timed on")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    n_examples = args.batches * args.batch_size
+    examples = list(labeled_stream(n_examples // 2 + 500, seed=0))
+    held_out, examples = examples[:1000], examples[1000:1000 + n_examples]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        online = OnlineStatisticalChecker(artifact_dir=tmp_dir, lm_path=None)
+        batch_model = StatisticalChecker(artifact_dir=tmp_dir, lm_path=None)
+
+        for batch_number in range(1, args.batches + 1):
+            batch = examples[(batch_number - 1) * args.batch_size:batch_number * args.batch_size]
+            texts, spelling_labels, grammar_labels = zip(*batch)
+            start = time.perf_counter()
+            online.partial_fit(texts, spelling_labels, grammar_labels)
+            batch_ms = (time.perf_counter() - start) * 1000
+            if batch_number % args.report_every and batch_number != 1:
+                continue
+
+            row = {
+                'examples_seen': online.examples_seen,
+                'online_batch_ms': round(batch_ms, 1),
+                'online_model_mb': round(model_bytes(online) / 2 ** 20, 2),
+                'online_accuracy': accuracy(online, held_out),
+            }
+            seen = batch_number * args.batch_size
+            if seen <= args.refit_max:
+                # The existing model has to be refitted from scratch on everything seen so far
+                batch_model.train_texts = [text for text, _, _ in examples[:seen]]
+                batch_model.spelling_labels = [label for _, label, _ in examples[:seen]]
+                batch_model.grammar_labels = [label for _, _, label in examples[:seen]]
+                start = time.perf_counter()
+                batch_model._train_models()
+                row['refit_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                row['refit_model_mb'] = round(model_bytes(batch_model) / 2 ** 20, 2)
+                row['refit_accuracy'] = accuracy(batch_model, held_out)
+            results.append(row)
+            print(json.dumps(row))
+
+        # Publishing: an in-process swap and a snapshot that other processes reload
+        registry = ModelRegistry({'ML': lambda: online})
+        registry.get('ML')
+        start = time.perf_counter()
+        registry.replace('ML', online.copy())
+        swap_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        path = online.save()
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        OnlineStatisticalChecker(artifact_dir=tmp_dir, lm_path=None)
+        load_ms = (time.perf_counter() - start) * 1000
+        row = {'copy_and_swap_ms': round(swap_ms, 1), 'snapshot_save_ms': round(save_ms, 1),
+               'snapshot_load_ms': round(load_ms, 1), 'snapshot_path': path}
+        results.append(row)
+        print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
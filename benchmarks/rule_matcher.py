@@ -0,0 +1,109 @@
+import argparse
+import json
+import random
+import re
+import time
+
+from models.rule_based_model import RuleBasedChecker
+from models.segmenter import segment
+from benchmarks.synthetic import synthetic_word
+
+PRONOUNS = ['நான்', 'நாங்கள்', 'நீ', 'நீங்கள்', 'அவன்', 'அவள்', 'அவர்', 'அவர்கள்', 'அது', 'அவை']
+VERB_SUFFIXES = ['கிறேன்', 'கிறோம்', 'கிறாய்', 'கிறீர்கள்', 'கிறான்', 'கிறாள்', 'கிறார்', 'கிறார்கள்', 'கிறது', 'கின்றன']
+
+
+def synthetic_rules(n_spelling, n_agreement, rng):
+    spelling = [(synthetic_word(rng, 2, 3), f'Spelling rule {i}', synthetic_word(rng)) for i in range(n_spelling)]
+
+    # Every pronoun/suffix pair, then made-up suffixes until the requested count is reached
+    pairs = [(p, s) for p in PRONOUNS for s in VERB_SUFFIXES]
+    while len(pairs) < n_agreement:
+        pairs.append((rng.choice(PRONOUNS), synthetic_word(rng, 2, 3)))
+    agreement = [(f'{p}.*{s}', f'Agreement rule {i}', f'{p}.*{s}') for i, (p, s) in enumerate(pairs[:n_agreement])]
+    return spelling, agreement
+
+
+def synthetic_text(rng, n_sentences, vocab):
+    sentences = []
+    for _ in range(n_sentences):
+        words = [rng.choice(PRONOUNS)] + [rng.choice(vocab) for _ in range(rng.randint(3, 8))]
+        words.append(synthetic_word(rng, 1, 2) + rng.choice(VERB_SUFFIXES))
+        sentences.append(' '.join(words))
+    return '. '.join(sentences) + '.'
+
+
+def legacy_check(checker, text):
+    # The previous implementation: every rule searched against every token and sentence
+    corrections = []
+    for word in (token.text for sentence in segment(text) for token in sentence.words()):
+        for pattern, msg, correction in checker.grammar_rules['spelling_patterns']:
+            if re.search(pattern, word):
+                corrections.append(('spelling', msg, word, correction))
+        if word not in checker.tamil_words and not any(char.isdigit() for char in word):
+            corrections.append(('spelling', f'Unknown word: {word}', word, checker.best_correction(word)))
+    for sentence in checker.split_sentences(text):
+        for pattern, error_msg, correction in checker.grammar_rules['subject_verb_agreement']:
+            if re.search(pattern, sentence):
+                corrections.append(('grammar', error_msg, sentence, re.sub(pattern, correction, sentence)))
+    return corrections
+
+
+def compiled_check(checker, text):
+    return checker.check_spelling(text) + checker.check_grammar(text)
+
+
+def rules_hit(results):
+    # Findings now carry offsets and word-level fixes, so runs are compared on which rules fired
+    return [[tuple(finding)[:2] for finding in findings] for findings in results]
+
+
+def time_per_text(func, checker, texts):
+    start = time.perf_counter()
+    results = [func(checker, text) for text in texts]
+    return (time.perf_counter() - start) * 1000 / len(texts), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-rule regex loop with the compiled rule matcher.")
+    parser.add_argument('--rule-counts', type=int, nargs='+', default=[10, 100, 1000, 2000], help="Rules per table")
+    parser.add_argument('--texts', type=int, default=20, help="Number of texts per run")
+    parser.add_argument('--sentences', type=int, default=5, help="Sentences per text")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocab = [synthetic_word(rng) for _ in range(2000)]
+    texts = [synthetic_text(rng, args.sentences, vocab) for _ in range(args.texts)]
+
+    results = []
+    for count in args.rule_counts:
+        spelling, agreement = synthetic_rules(count, count, rng)
+        checker = RuleBasedChecker()
+        checker.grammar_rules = {'spelling_patterns': spelling, 'subject_verb_agreement': agreement}
+
+        start = time.perf_counter()
+        checker._compile_rules()
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms, legacy_results = time_per_text(legacy_check, checker, texts)
+        compiled_ms, compiled_results = time_per_text(compiled_check, checker, texts)
+
+        row = {
+            'rules_per_table': count,
+            'compile_ms': round(compile_ms, 2),
+            'legacy_ms_per_text': round(legacy_ms, 3),
+            'compiled_ms_per_text': round(compiled_ms, 3),
+            'speedup': round(legacy_ms / compiled_ms, 1),
+            'identical': rules_hit(legacy_results) == rules_hit(compiled_results),
+            'findings': sum(len(r) for r in compiled_results)
+        }
+        results.append(row)
+        print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
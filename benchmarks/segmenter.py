@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from models.segmenter import segment, iter_sentences
+from benchmarks._common import peak_rss_mb, timed_ms
+from benchmarks.checkers import synthetic_corpus
+
+SENTENCE_BOUNDARY = re.compile('[.!?।]')
+
+
+def trivial_tokenize(text):
+    # indicnlp's tokenizer, imported on first use so its import time is measured separately
+    from indicnlp.tokenize.indic_tokenize import trivial_tokenize as indic_tokenize
+    return indic_tokenize(text)
+
+
+def two_pass(text):
+    # The previous approach: indicnlp tokens located with str.find, then a separate sentence split
+    tokens = []
+    position = 0
+    for word in trivial_tokenize(text):
+        start = text.find(word, position)
+        position = start + len(word)
+        tokens.append((word, start, position))
+    sentences = []
+    start = 0
+    for end in [match.start() for match in SENTENCE_BOUNDARY.finditer(text)] + [len(text)]:
+        segment_text = text[start:end]
+        if segment_text.strip():
+            sentences.append(segment_text.strip())
+        start = end + 1
+    return tokens, sentences
+
+
+def single_pass(text):
+    return segment(text)
+
+
+def run_stream_worker(path, mode):
+    # Peak memory of segmenting a file as a stream versus reading it whole
+    start = time.perf_counter()
+    count = 0
+    with open(path, encoding='utf-8') as f:
+        if mode == 'stream':
+            for _ in iter_sentences(f):
+                count += 1
+        else:
+            count = len(segment(f.read()))
+    return {
+        'mode': mode,
+        'sentences': count,
+        'seconds': round(time.perf_counter() - start, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the two-pass tokenize + sentence split with the single-pass segmenter.")
+    parser.add_argument('--docs', type=int, nargs='+', default=[10, 100, 1000], help="Synthetic documents joined per text")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--stream-docs', type=int, default=200000, help="Documents in the file used for the streaming run")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--worker', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stream_worker(*args.worker)))
+        return
+
+    results = []
+    # First call pays for importing indicnlp, which the single-pass segmenter never loads
+    start = time.perf_counter()
+    trivial_tokenize('நான்')
+    results.append({'indicnlp_first_call_ms': round((time.perf_counter() - start) * 1000, 2)})
+    print(json.dumps(results[-1]))
+
+    for n_docs in args.docs:
+        text = '. '.join(synthetic_corpus(n_docs, seed=n_docs)) + '.'
+        row = {
+            'chars': len(text),
+            'two_pass_ms': round(timed_ms(two_pass, text, repeat=args.repeat), 3),
+            'single_pass_ms': round(timed_ms(single_pass, text, repeat=args.repeat), 3),
+        }
+        row['speedup'] = round(row['two_pass_ms'] / row['single_pass_ms'], 2)
+        results.append(row)
+        print(json.dumps(row))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'corpus.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for doc in synthetic_corpus(args.stream_docs, seed=1):
+                f.write(doc + '.\n')
+        for mode in ('whole', 'stream'):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.segmenter', '--worker', path, mode],
+                check=True, capture_output=True, text=True
+            ).stdout
+            row = {'file_mb': round(os.path.getsize(path) / 2 ** 20, 1)}
+            row.update(json.loads(output))
+            results.append(row)
+            print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from models.ML_model import StatisticalChecker
+from benchmarks._common import peak_rss_mb
+from benchmarks.synthetic import synthetic_vocab
+
+
+def synthetic_corpus(vocab_size, n_docs, words_per_doc=8, seed=0):
+    rng = random.Random(seed)
+    vocab = synthetic_vocab(vocab_size, rng)
+    texts = [' '.join(rng.choice(vocab) for _ in range(words_per_doc)) for _ in range(n_docs)]
+    labels = [i % 2 for i in range(n_docs)]
+    return texts, labels
+
+
+def run_worker(mode, vocab_size, n_docs, n_queries):
+    texts, labels = synthetic_corpus(vocab_size, n_docs)
+
+    checker = StatisticalChecker(artifact_dir=tempfile.mkdtemp())
+    checker.train_texts = texts
+    checker.spelling_labels = labels
+    checker.grammar_labels = labels
+
+    if mode == 'dense':
+        # Reproduces the previous pipeline, which densified both TF-IDF matrices
+        checker._combine_features = lambda word, char: np.hstack([word.toarray(), char.toarray()])
+
+    start = time.perf_counter()
+    checker._train_models()
+    train_seconds = time.perf_counter() - start
+
+    queries = texts[:n_queries]
+    start = time.perf_counter()
+    for text in queries:
+        features = checker._extract_features(text)
+        checker.spelling_model.predict_proba(features)
+        checker.grammar_model.predict_proba(features)
+    per_text_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    return {
+        'mode': mode,
+        'vocab_words': vocab_size,
+        'docs': n_docs,
+        'ngrams': len(checker.word_vectorizer.vocabulary_) + len(checker.char_vectorizer.vocabulary_),
+        'train_seconds': round(train_seconds, 3),
+        'per_text_ms': round(per_text_ms, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense and sparse feature pipelines of StatisticalChecker.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 5000, 50000], help="Synthetic vocabulary sizes (words)")
+    parser.add_argument('--docs', type=int, default=2000, help="Minimum number of training documents; larger vocabularies use one document per word")
+    parser.add_argument('--queries', type=int, default=200, help="Number of texts to time for prediction")
+    parser.add_argument('--dense-limit-mb', type=int, default=1024, help="Skip the dense run when its matrix would exceed this size")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, size = args.worker
+        print(json.dumps(run_worker(mode, int(size), args.docs, args.queries)))
+        return
+
+    results = []
+    for size in args.sizes:
+        # Grow the corpus with the vocabulary so the n-gram count keeps rising
+        n_docs = max(args.docs, size)
+        for mode in ('sparse', 'dense'):
+            row = None
+            if mode == 'dense' and results:
+                # Estimate from the n-gram count measured by the sparse run
+                ngrams = results[-1]['ngrams']
+                if ngrams * n_docs * 8 / 2 ** 20 > args.dense_limit_mb:
+                    row = {'mode': mode, 'vocab_words': size, 'docs': n_docs, 'ngrams': ngrams, 'skipped': 'dense matrix over limit'}
+
+            if row is None:
+                # Each run gets its own process so peak RSS is not shared between runs
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.sparse_features', '--docs', str(n_docs),
+                     '--queries', str(args.queries), '--worker', mode, str(size)],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                row = json.loads(output.strip().splitlines()[-1])
+
+            results.append(row)
+            print(json.dumps(row, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
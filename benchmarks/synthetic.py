@@ -0,0 +1,16 @@
+import random
+
+# Tamil consonants and vowel signs used to build synthetic words
+CONSONANTS = list('கஙசஞடணதநபமயரலவழளறன')
+VOWEL_SIGNS = ['', 'ா', 'ி', 'ீ', 'ு', 'ூ', 'ெ', 'ே', 'ை', 'ொ', 'ோ', '்']
+
+
+def synthetic_word(rng, min_len=2, max_len=5):
+    return ''.join(rng.choice(CONSONANTS) + rng.choice(VOWEL_SIGNS) for _ in range(rng.randint(min_len, max_len)))
+
+
+def synthetic_vocab(size, rng, min_len=2, max_len=5):
+    vocab = set()
+    while len(vocab) < size:
+        vocab.add(synthetic_word(rng, min_len, max_len))
+    return sorted(vocab)
@@ -1,39 +1,195 @@
 # main.py
 import streamlit as st
-import numpy as np
-from models.rule_based_model import RuleBasedChecker
-from models.ML_model import StatisticalChecker
-from models.deep_Learning_model import GemmaChecker
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from models.registry import registry, MODEL_TIMEOUTS
+from models.incremental import IncrementalChecker, SentenceResultCache
+from models.metrics import stage_metrics, profiler, start_profiler_from_env
+from models.findings import Finding
 
 
-def compare_models(text):
-    models = {
-        'Rule-based': RuleBasedChecker(),
-        'ML': StatisticalChecker(),
-        'Deep-Learning': GemmaChecker()
-    }
+# One pool per model, shared by every session. A timed-out call keeps its worker until the call returns,
+# so a slow LLM can only hold up LLM calls and never the local models
+EXECUTOR_WORKERS = {'Deep-Learning': 8}
+DEFAULT_EXECUTOR_WORKERS = 4
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(model_name):
+    with _executors_lock:
+        if model_name not in _executors:
+            _executors[model_name] = ThreadPoolExecutor(
+                max_workers=EXECUTOR_WORKERS.get(model_name, DEFAULT_EXECUTOR_WORKERS),
+                thread_name_prefix=f'checker-{model_name}'
+            )
+        return _executors[model_name]
+
+
+def _run_model(model_name, text, session_cache=None, on_event=None):
+    # Sentences checked before (in this session or any other) reuse their cached findings
+    model = registry.get(model_name)
+    # A hot-swapped model gets a fresh cache namespace, so results of the replaced one are not reused
+    cache_name = f"{model_name}#{registry.generation(model_name)}"
+    checker = IncrementalChecker(session=session_cache)
+    suggestions = None
+    if model_name == 'Rule-based':
+        errors, _ = checker.check(cache_name, text, lambda sentences: [c for c, _ in model.check_texts(sentences)])
+        suggestions = model.format_suggestions(errors)
+    elif model_name == 'Deep-Learning':
+        # Whole chunks in parallel instead of a request per sentence; the response cache answers unchanged chunks
+        errors = model.check_document(text)
+        suggestions = "\n\n".join(error.message for error in errors)
+    else:
+        # The class probabilities behind the findings are cached with them and reported per sentence
+        errors, confidence, _ = checker.check_scored(cache_name, text, model.check_texts_scored)
+        if on_event is not None:
+            on_event('confidence', confidence)
+    return errors, suggestions
+
+
+def _stream_model(model_name, text, on_event, deadline=None):
+    # Streams the LLM response for the same chunks check_document sends, all chunks at once, reporting the
+    # text received so far after every delta; unchanged chunks come straight from the response cache
+    model = registry.get(model_name)
+    spans = model.document_spans(text)
+    parts = [""] * len(spans)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    first_token = []
+
+    def stream_chunk(index):
+        chunk_start, chunk_end = spans[index]
+        stream = model.stream_suggestions(text[chunk_start:chunk_end], deadline)
+        for _ in stream:
+            with lock:
+                if not stream.cached and not first_token:
+                    first_token.append(time.perf_counter() - start)
+                parts[index] = stream.text
+                on_event('chunk', "\n\n".join(part for part in parts if part))
+        error_type = "error" if stream.text.startswith("Error") else "info"
+        return Finding(error_type, stream.text, chunk_start, chunk_end, None, text)
+
+    findings = []
+    if spans:
+        # The backend's concurrency and rate limits still apply to the parallel streams
+        with ThreadPoolExecutor(max_workers=min(model.backend.max_concurrency, len(spans))) as executor:
+            findings = list(executor.map(stream_chunk, range(len(spans))))
+
+    total_time = time.perf_counter() - start
+    on_event('timing', {
+        'time_to_first_token': first_token[0] if first_token else total_time,
+        'total_time': total_time,
+        'cached': not first_token
+    })
+    return findings, "\n\n".join(part for part in parts if part)
+
+
+def iter_model_events(text, model_names=None, timeouts=None, stream=False, session_cache=None):
+    # Run the selected models concurrently and yield (kind, model_name, payload) events:
+    # 'result' with (errors, suggestions) once per model, plus 'chunk' and 'timing' for a streamed LLM and
+    # 'confidence' with (sentence, probabilities) pairs for ML
+    if model_names is None:
+        model_names = registry.names()
+    timeouts = {**MODEL_TIMEOUTS, **(timeouts or {})}
+    events = queue.Queue()
+
+    def run(model_name, deadline):
+        try:
+            if stream and model_name == 'Deep-Learning':
+                result = _stream_model(
+                    model_name, text, lambda kind, payload: events.put((kind, model_name, payload)), deadline
+                )
+            else:
+                result = _run_model(
+                    model_name, text, session_cache, lambda kind, payload: events.put((kind, model_name, payload))
+                )
+        except Exception as e:
+            result = [Finding.whole('error', f'Error processing text: {str(e)}', text)], None
+        events.put(('result', model_name, result))
+
+    start = time.monotonic()
+    deadlines = {}
+    for model_name in model_names:
+        deadlines[model_name] = start + timeouts.get(model_name, 60)
+        _executor(model_name).submit(run, model_name, deadlines[model_name])
+
+    while deadlines:
+        remaining = max(0, min(deadlines.values()) - time.monotonic())
+        try:
+            kind, model_name, payload = events.get(timeout=remaining)
+        except queue.Empty:
+            kind = None
+
+        # Events from models that already timed out are dropped
+        if kind is not None and model_name in deadlines:
+            if kind == 'result':
+                del deadlines[model_name]
+            yield kind, model_name, payload
+
+        now = time.monotonic()
+        for model_name in [name for name, deadline in deadlines.items() if deadline <= now]:
+            del deadlines[model_name]
+            timeout = timeouts.get(model_name, 60)
+            yield 'result', model_name, ([Finding.whole('timeout', f'No result within {timeout:g} seconds', text)], None)
+
+
+def iter_model_results(text, model_names=None, timeouts=None):
+    # Yield (model_name, errors, suggestions) as each model finishes
+    for kind, model_name, payload in iter_model_events(text, model_names, timeouts):
+        if kind == 'result':
+            errors, suggestions = payload
+            yield model_name, errors, suggestions
+
+
+def compare_models(text, model_names=None, timeouts=None):
+    # Only the selected models are built (once per process) and run
+    results = {}
+    suggestions = {}
+    
+    for model_name, errors, model_suggestions in iter_model_results(text, model_names, timeouts):
+        results[model_name] = errors
+        if model_suggestions is not None:
+            suggestions[model_name] = model_suggestions
+    
+    return results, suggestions
+
+
+def compare_models_batch(texts, model_names=None):
+    # Batch variant of compare_models: each model checks all texts in one call
+    texts = list(texts)
+    if model_names is None:
+        model_names = registry.names()
     
     results = {}
     suggestions = {}
     
-    for model_name, model in models.items():
+    for model_name in model_names:
         try:
+            model = registry.get(model_name)
+            errors = model.check_texts(texts)
             if model_name == 'Rule-based':
-                errors = model.check_text(text)
-                suggestions[model_name] = model.get_correction_suggestions(text)
+                errors = [corrections for corrections, _ in errors]
+                suggestions[model_name] = [model.format_suggestions(corrections) for corrections in errors]
             elif model_name == 'Deep-Learning':
-                suggestions[model_name] = model.get_suggestions(text)
-                errors = model.check_text(text)
-            else:
-                errors = model.check_text(text)
+                suggestions[model_name] = ["\n\n".join(error.message for error in result) for result in errors]
             
             results[model_name] = errors
         except Exception as e:
-            results[model_name] = [('error', f'Error processing text: {str(e)}', text)]
+            results[model_name] = [[Finding.whole('error', f'Error processing text: {str(e)}', text)] for text in texts]
     
     return results, suggestions
 
 
+@st.cache_resource
+def _start_profiler_once():
+    # Streamlit reruns the script on every interaction; CHECKER_PROFILE only decides the first run, so
+    # unticking the profiler box keeps it stopped
+    return start_profiler_from_env()
+
+
 def main():
     # Apply CSS styles
     st.markdown("""
@@ -93,9 +249,13 @@ def main():
     # Sidebar for settings
     with st.sidebar:
         st.markdown("<div class='settings-header'>Models</div>", unsafe_allow_html=True)
-        use_rule_based = st.checkbox("Rule-based Model", value=True, key="rule_based")
-        use_statistical = st.checkbox("ML Model", value=True, key="statistical")
-        use_gemma = st.checkbox("Deep-Learning", value=True, key="deep_learning")
+        # Models whose optional dependencies are not installed are shown but cannot be selected
+        use_rule_based = st.checkbox("Rule-based Model", value=registry.is_available('Rule-based'), key="rule_based",
+                                     disabled=not registry.is_available('Rule-based'))
+        use_statistical = st.checkbox("ML Model", value=registry.is_available('ML'), key="statistical",
+                                      disabled=not registry.is_available('ML'))
+        use_gemma = st.checkbox("Deep-Learning", value=registry.is_available('Deep-Learning'), key="deep_learning",
+                                disabled=not registry.is_available('Deep-Learning'))
         
         st.markdown("<div class='settings-header'>Select Type</div>", unsafe_allow_html=True)
         input_type = st.radio(
@@ -103,6 +263,14 @@ def main():
             ["Use custom text", "Example Sentences"],
             label_visibility="collapsed"
         )
+        
+        st.markdown("<div class='settings-header'>Diagnostics</div>", unsafe_allow_html=True)
+        _start_profiler_once()
+        use_profiler = st.checkbox("Sampling profiler", value=profiler.is_running(), key="profiler")
+        if use_profiler and not profiler.is_running():
+            profiler.start()
+        elif not use_profiler and profiler.is_running():
+            profiler.stop()
 
     # Main content area
     example_texts = {
@@ -146,14 +314,6 @@ def main():
     if check_button and text_input:
         st.markdown("---")
         
-        # Get analysis results
-        results, suggestions = compare_models(text_input)
-        
-        st.markdown("### Input Text")
-        st.markdown(f'<div class="result-box">{text_input}</div>', unsafe_allow_html=True)
-        
-        st.markdown("### Analysis Results")
-        
         # Create tabs for models
         model_tabs = []
         if use_rule_based:
@@ -163,37 +323,115 @@ def main():
         if use_gemma:
             model_tabs.append("Deep-Learning")
         
-        tabs = st.tabs(model_tabs)
+        st.markdown("### Input Text")
+        st.markdown(f'<div class="result-box">{text_input}</div>', unsafe_allow_html=True)
+        
+        st.markdown("### Analysis Results")
         
+        tabs = st.tabs(model_tabs)
+        placeholders = {}
         for tab, model_name in zip(tabs, model_tabs):
             with tab:
-                if results[model_name]:
-                    for error_type, msg, context in results[model_name]:
+                placeholders[model_name] = st.empty()
+                placeholders[model_name].info("Checking...")
+        
+        # Fill each tab as soon as its model finishes; the LLM response is streamed in as it arrives
+        results = {}
+        suggestions = {}
+        timings = {}
+        confidences = {}
+        # Per-session sentence cache in front of the process-wide one
+        if 'sentence_cache' not in st.session_state:
+            st.session_state['sentence_cache'] = SentenceResultCache(max_entries=500)
+        session_cache = st.session_state['sentence_cache']
+        latencies = {}
+        start = time.perf_counter()
+        for kind, model_name, payload in iter_model_events(text_input, model_tabs, stream=True, session_cache=session_cache):
+            if kind == 'chunk':
+                placeholders[model_name].markdown(payload + " ▌")
+                continue
+            if kind == 'timing':
+                timings[model_name] = payload
+                continue
+            if kind == 'confidence':
+                confidences[model_name] = payload
+                continue
+            
+            errors, model_suggestions = payload
+            latencies[model_name] = time.perf_counter() - start
+            results[model_name] = errors
+            if model_suggestions is not None:
+                suggestions[model_name] = model_suggestions
+            
+            with placeholders[model_name].container():
+                if errors:
+                    for error in errors:
                         st.markdown(
                             f'<div class="result-box">'
-                            f'<div class="error-type">Error Type: {error_type}</div>'
-                            f'<div class="message">Message: {msg}</div>'
-                            f'<div class="context">Context: {context}</div>'
+                            f'<div class="error-type">Error Type: {error.kind}</div>'
+                            f'<div class="message">Message: {error.message}</div>'
+                            f'<div class="context">Context: {error.context}</div>'
                             f'</div>',
                             unsafe_allow_html=True
                         )
                 else:
                     st.success("No errors found.")
+                
+                timing = timings.get(model_name)
+                if timing and timing['total_time'] is not None:
+                    source = " (cached)" if timing['cached'] else ""
+                    first_token = timing['time_to_first_token'] or timing['total_time']
+                    st.caption(f"First token after {first_token:.2f}s, complete after {timing['total_time']:.2f}s{source}")
         
-        # Display confidence scores
-        st.markdown("### Confidence Scores")
-        score_cols = st.columns(len(model_tabs))
-        
-        for col, model_name in zip(score_cols, model_tabs):
+        # Measured wall-clock latency per model
+        st.markdown("### Latency")
+        latency_cols = st.columns(len(model_tabs))
+        for col, model_name in zip(latency_cols, model_tabs):
             with col:
-                confidence = len(results[model_name]) > 0
-                confidence_score = np.random.uniform(0.7, 0.99) if confidence else np.random.uniform(0.8, 0.95)
                 st.metric(
                     label=model_name,
-                    value=f"{confidence_score:.1%}",
-                    delta=f"{'↓' if confidence else '↑'} {abs(0.5 - confidence_score):.1%}",
-                    help="This score indicates the model's confidence in its analysis."
+                    value=f"{latencies[model_name] * 1000:.0f} ms",
+                    help="Time from submitting the text until this model's result arrived."
                 )
+        
+        # Class probabilities behind the ML findings, from the same run; the other checkers do not produce them
+        if 'ML' in model_tabs:
+            st.markdown("### Confidence Scores")
+            scores = [score for _, score in confidences.get('ML', []) if score is not None]
+            if scores:
+                score_cols = st.columns(2)
+                for col, label in zip(score_cols, ('spelling', 'grammar')):
+                    with col:
+                        st.metric(
+                            label=f"ML {label}",
+                            value=f"{min(score[label] for score in scores):.1%}",
+                            help=f"Probability from the {label} model that the text is correct; "
+                                 f"the lowest of its {len(scores)} sentence(s)."
+                        )
+                if len(scores) > 1:
+                    with st.expander("Confidence per sentence"):
+                        st.dataframe(
+                            [{'sentence': sentence, **score} for sentence, score in confidences['ML'] if score is not None],
+                            use_container_width=True
+                        )
+            else:
+                st.warning("Confidence scores unavailable: the ML checker returned no probabilities.")
+        
+        with st.expander("Stage timings"):
+            rows = [
+                {
+                    'checker': row['checker'],
+                    'stage': row['stage'],
+                    'calls': row['count'],
+                    'p50 (ms)': round(row['p50_seconds'] * 1000, 3),
+                    'p99 (ms)': round(row['p99_seconds'] * 1000, 3),
+                }
+                for row in stage_metrics.to_json()
+            ]
+            st.table(rows)
+            if profiler.samples:
+                st.markdown(f"Profiler: {profiler.samples} samples")
+                st.table([{'function': name, 'samples': count} for name, count in profiler.top_functions(15)])
 
 
 if __name__ == "__main__":
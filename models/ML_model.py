@@ -1,20 +1,46 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import numpy as np
+from sklearn.linear_model import SGDClassifier
+import sklearn
+import scipy.sparse as sp
+import argparse
+import copy
+import hashlib
+import joblib
+import json
+import os
 import re
+import sys
+import tempfile
+import time
+
+from models.findings import Finding
+from models.metrics import timed
+from models.ngram_lm import NgramLanguageModel, DEFAULT_LM_PATH
+
+# Bump whenever the saved layout or feature pipeline changes
+ARTIFACT_VERSION = 2
+DEFAULT_ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts', 'statistical')
+# Hashed feature space per vectorizer in online mode; fixes the model size however much data is seen
+ONLINE_FEATURES = 2 ** 17
+# How often a served online model checks whether a trainer has saved a newer snapshot, in seconds
+ONLINE_REFRESH_INTERVAL = 5.0
+# Words the language model scores below this log10 value given their preceding words are flagged
+CONTEXT_LOG10_THRESHOLD = -5.0
 
 
 class StatisticalChecker:
-    def __init__(self):
-        # Initialize multiple vectorizers for different features
-        self.word_vectorizer = TfidfVectorizer(ngram_range=(1, 2), analyzer='word')
-        self.char_vectorizer = TfidfVectorizer(ngram_range=(2, 4), analyzer='char')
+    ARTIFACT_PREFIX = 'statistical'
+    # Everything save() writes and load() restores
+    STATE_FIELDS = ('word_vectorizer', 'char_vectorizer', 'spelling_model', 'grammar_model')
 
-        # Initialize multiple models
-        self.spelling_model = MultinomialNB()
-        self.grammar_model = RandomForestClassifier(n_estimators=100)
+    def __init__(self, artifact_dir=DEFAULT_ARTIFACT_DIR, retrain=False, lm_path=DEFAULT_LM_PATH):
+        self.artifact_dir = artifact_dir
+        # Optional n-gram model for context checks, used when one has been compiled
+        self.language_model = NgramLanguageModel.load_default(lm_path)
+
+        self._init_models()
 
         # Expanded dataset with incorrect sentences and labels
         self.train_texts = [
@@ -34,8 +60,8 @@ class StatisticalChecker:
         self.spelling_labels = [1, 1, 1, 0, 1, 0, 1, 0, 1, 0]
         self.grammar_labels = [1, 1, 1, 0, 1, 0, 1, 0, 1, 0]
 
-        # Train the models
-        self._train_models()
+        # Load the fitted models from disk, training only when the data or settings changed
+        self._load_or_train(retrain)
 
         # Error patterns for post-processing
         self.error_patterns = {
@@ -61,31 +87,108 @@ class StatisticalChecker:
             }
         }
 
+    def _init_models(self):
+        # Initialize multiple vectorizers for different features
+        self.word_vectorizer = TfidfVectorizer(ngram_range=(1, 2), analyzer='word')
+        self.char_vectorizer = TfidfVectorizer(ngram_range=(2, 4), analyzer='char')
+
+        # Initialize multiple models
+        self.spelling_model = MultinomialNB()
+        self.grammar_model = RandomForestClassifier(n_estimators=100)
+
     def _train_models(self):
         # Prepare features
         word_features = self.word_vectorizer.fit_transform(self.train_texts)
         char_features = self.char_vectorizer.fit_transform(self.train_texts)
 
-        # Combine features
-        combined_features = np.hstack([
-            word_features.toarray(),
-            char_features.toarray()
-        ])
+        # Combine features without densifying
+        combined_features = self._combine_features(word_features, char_features)
 
         # Train models
         self.spelling_model.fit(combined_features, self.spelling_labels)
         self.grammar_model.fit(combined_features, self.grammar_labels)
 
+    def fingerprint(self):
+        # Hash of everything that affects the fitted models
+        payload = {
+            'version': ARTIFACT_VERSION,
+            'sklearn': sklearn.__version__,
+            'train_texts': self.train_texts,
+            'spelling_labels': self.spelling_labels,
+            'grammar_labels': self.grammar_labels,
+            'params': {
+                name: sorted((key, repr(value)) for key, value in getattr(self, name).get_params().items())
+                for name in ('word_vectorizer', 'char_vectorizer', 'spelling_model', 'grammar_model')
+            }
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def artifact_path(self):
+        return os.path.join(self.artifact_dir, f'{self.ARTIFACT_PREFIX}-v{ARTIFACT_VERSION}-{self.fingerprint()}.joblib')
+
+    def save(self, path=None):
+        path = path or self.artifact_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        artifact = {'version': ARTIFACT_VERSION, 'fingerprint': self.fingerprint()}
+        artifact.update((field, getattr(self, field)) for field in self.STATE_FIELDS)
+        # Write to a temporary file first so other processes never see a partial artifact
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(artifact, tmp_path)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def load(self, path=None):
+        path = path or self.artifact_path()
+        # Plain numpy arrays (TF-IDF idf_, naive Bayes and SGD weights) are memory-mapped and shared between
+        # worker processes. RandomForest trees are not: each tree copies its nodes into private memory on load,
+        # and fitted vocabularies are ordinary dicts
+        artifact = joblib.load(path, mmap_mode='r')
+        if artifact.get('version') != ARTIFACT_VERSION or artifact.get('fingerprint') != self.fingerprint():
+            raise ValueError(f"Stale statistical model artifact: {path}")
+
+        for field in self.STATE_FIELDS:
+            setattr(self, field, artifact[field])
+
+    def _load_or_train(self, retrain=False):
+        path = self.artifact_path()
+        if not retrain and os.path.exists(path):
+            # An artifact that fails to load is never trained over: for the online model it holds
+            # everything a trainer has learned so far
+            try:
+                self.load(path)
+            except Exception as error:
+                raise RuntimeError(f"Cannot load statistical model artifact {path}; delete it or retrain") from error
+            return
+
+        self._train_models()
+        try:
+            self.save(path)
+        except OSError:
+            # A read-only deployment can still run with the in-memory models
+            pass
+
     def _extract_features(self, text):
-        # Extract word and character features
-        word_feats = self.word_vectorizer.transform([text])
-        char_feats = self.char_vectorizer.transform([text])
+        return self._extract_features_batch([text])
+
+    def _extract_features_batch(self, texts):
+        # Extract word and character features for all texts in one call
+        word_feats = self.word_vectorizer.transform(texts)
+        char_feats = self.char_vectorizer.transform(texts)
 
         # Combine features
-        return np.hstack([
-            word_feats.toarray(),
-            char_feats.toarray()
-        ])
+        return self._combine_features(word_feats, char_feats)
+
+    @staticmethod
+    def _combine_features(word_feats, char_feats):
+        # Both models accept CSR input, so the TF-IDF matrices stay sparse end to end
+        return sp.hstack([word_feats, char_feats], format='csr')
 
     def _analyze_patterns(self, text):
         errors = []
@@ -93,38 +196,216 @@ class StatisticalChecker:
         for pattern, msg in self.error_patterns['common_errors'].items():
             match = re.search(pattern, text)
             if match:
-                errors.append(('pattern', msg, text, match.group()))
+                suggestion = self.error_patterns['suggestions'].get(msg, {}).get(match.group())
+                errors.append(Finding('pattern', msg, match.start(), match.end(), suggestion, text))
 
         return errors
 
-    def check_text(self, text):
-        try:
-            features = self._extract_features(text)
-
-            # Get model predictions
-            spelling_pred = self.spelling_model.predict_proba(features)[0]
-            grammar_pred = self.grammar_model.predict_proba(features)[0]
+    def _analyze_context(self, text):
+        # Words that are unlikely after the words before them, according to the n-gram model
+        return [
+            Finding('context', 'Unlikely word in context', token.start, token.end, None, text)
+            for token, score in self.language_model.word_scores(text)
+            if score < CONTEXT_LOG10_THRESHOLD
+        ]
 
+    def _build_suggestions(self, text, spelling_pred, grammar_pred):
+        try:
             errors = []
 
-            # Check spelling confidence
+            # Check spelling confidence; confidence errors refer to the whole text
             if spelling_pred[0] < 0.8:  # Less than 80% confidence for correct spelling
-                errors.append(('spelling', 'Low spelling confidence', text))
+                errors.append(Finding.whole('spelling', 'Low spelling confidence', text))
 
             # Check grammar confidence
             if grammar_pred[0] < 0.8:  # Less than 80% confidence for correct grammar
-                errors.append(('grammar', 'Low grammar confidence', text))
+                errors.append(Finding.whole('grammar', 'Low grammar confidence', text))
 
             # Add pattern-based errors
-            pattern_errors = self._analyze_patterns(text)
-            errors.extend(pattern_errors)
+            with timed('regex', 'ML'):
+                errors.extend(self._analyze_patterns(text))
+
+            if self.language_model is not None:
+                with timed('language_model', 'ML'):
+                    errors.extend(self._analyze_context(text))
+
+            return errors
+        except Exception as e:
+            return [Finding.whole('error', str(e), text)]
+
+    @staticmethod
+    def _correct_first(model, probabilities):
+        # Label 1 marks correct text, and classes_ is sorted, so its probability is moved to column 0
+        correct = list(model.classes_).index(1)
+        return probabilities[:, [correct, 1 - correct]]
+
+    def predict_proba(self, texts):
+        # (spelling, grammar) class probabilities per text; column 0 is the probability that the text is correct
+        with timed('feature_extraction', 'ML'):
+            features = self._extract_features_batch(texts)
+
+        # Get model predictions for the whole batch in one matrix call
+        with timed('predict_proba', 'ML'):
+            spelling_preds = self._correct_first(self.spelling_model, self.spelling_model.predict_proba(features))
+            grammar_preds = self._correct_first(self.grammar_model, self.grammar_model.predict_proba(features))
+        return spelling_preds, grammar_preds
+
+    def check_text(self, text):
+        return self.check_texts([text])[0]
+
+    def check_texts(self, texts):
+        return [findings for findings, _ in self.check_texts_scored(texts)]
 
-            # Generate suggestions
-            suggestions = []
-            for error_type, msg, original_text, error_word in errors:
-                suggestion = self.error_patterns['suggestions'].get(msg, {}).get(error_word, 'No suggestion available')
-                suggestions.append((msg, error_word, suggestion))
+    def check_texts_scored(self, texts):
+        # (findings, confidence) per text, where confidence holds the probability from each model that the
+        # text is correct, or None if the models failed
+        texts = list(texts)
+        if not texts:
+            return []
 
-            return suggestions
+        try:
+            spelling_preds, grammar_preds = self.predict_proba(texts)
         except Exception as e:
-            return [('error', str(e), text)]
+            return [([Finding.whole('error', str(e), text)], None) for text in texts]
+
+        return [
+            (self._build_suggestions(text, spelling_pred, grammar_pred),
+             {'spelling': float(spelling_pred[0]), 'grammar': float(grammar_pred[0])})
+            for text, spelling_pred, grammar_pred in zip(texts, spelling_preds, grammar_preds)
+        ]
+
+def read_labeled(path):
+    # Yields (text, spelling_label, grammar_label) with 1 for correct and 0 for incorrect. JSON lines need
+    # text/spelling/grammar keys; other files are tab-separated text, spelling label, grammar label
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            if path.endswith('.jsonl'):
+                record = json.loads(line)
+                yield record['text'], int(record['spelling']), int(record['grammar'])
+            else:
+                text, spelling, grammar = line.rsplit('\t', 2)
+                yield text, int(spelling), int(grammar)
+
+
+def iter_labeled_batches(paths, batch_size):
+    # Mini-batches streamed from the labeled files, so no file is ever read whole
+    batch = []
+    for path in paths:
+        for example in read_labeled(path):
+            batch.append(example)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class OnlineStatisticalChecker(StatisticalChecker):
+    # The same checks on a fixed-size model that learns incrementally: hashed features need no fitted
+    # vocabulary and both classifiers support partial_fit, so a batch costs the same however many came before
+    ARTIFACT_PREFIX = 'statistical-online'
+    STATE_FIELDS = StatisticalChecker.STATE_FIELDS + ('examples_seen',)
+    CLASSES = [0, 1]
+
+    def __init__(self, artifact_dir=DEFAULT_ARTIFACT_DIR, retrain=False, lm_path=DEFAULT_LM_PATH):
+        self.examples_seen = 0
+        self._snapshot_path = None
+        self._snapshot_mtime = None
+        self._next_refresh = 0.0
+        # Loaded snapshots are memory-mapped read-only and copied on the first partial_fit
+        self._readonly = False
+        super().__init__(artifact_dir, retrain, lm_path)
+
+    def _init_models(self):
+        # alternate_sign=False keeps the features non-negative, which MultinomialNB requires
+        self.word_vectorizer = HashingVectorizer(ngram_range=(1, 2), analyzer='word', n_features=ONLINE_FEATURES, alternate_sign=False)
+        self.char_vectorizer = HashingVectorizer(ngram_range=(2, 4), analyzer='char', n_features=ONLINE_FEATURES, alternate_sign=False)
+        self.spelling_model = MultinomialNB()
+        self.grammar_model = SGDClassifier(loss='log_loss', random_state=0)
+
+    def _train_models(self):
+        # The built-in sentences seed the model; everything else arrives through partial_fit
+        self.partial_fit(self.train_texts, self.spelling_labels, self.grammar_labels)
+
+    def partial_fit(self, texts, spelling_labels, grammar_labels):
+        if self._readonly:
+            self.spelling_model = copy.deepcopy(self.spelling_model)
+            self.grammar_model = copy.deepcopy(self.grammar_model)
+            self._readonly = False
+        features = self._extract_features_batch(list(texts))
+        self.spelling_model.partial_fit(features, list(spelling_labels), classes=self.CLASSES)
+        self.grammar_model.partial_fit(features, list(grammar_labels), classes=self.CLASSES)
+        self.examples_seen += features.shape[0]
+        return self
+
+    def save(self, path=None):
+        path = super().save(path)
+        self._snapshot_path = path
+        self._snapshot_mtime = os.stat(path).st_mtime_ns
+        return path
+
+    def load(self, path=None):
+        path = path or self.artifact_path()
+        mtime = os.stat(path).st_mtime_ns
+        super().load(path)
+        self._snapshot_path = path
+        self._snapshot_mtime = mtime
+        self._readonly = True
+
+    def is_stale(self):
+        # Whether a trainer has saved a newer snapshot than the one served here. The file is checked at
+        # most every ONLINE_REFRESH_INTERVAL seconds, so most calls cost one clock read
+        now = time.monotonic()
+        if self._snapshot_path is None or now < self._next_refresh:
+            return False
+        self._next_refresh = now + ONLINE_REFRESH_INTERVAL
+        try:
+            return os.stat(self._snapshot_path).st_mtime_ns != self._snapshot_mtime
+        except OSError:
+            return False
+
+    def copy(self):
+        # An independent model to publish while this one keeps training; the stateless vectorizers
+        # and the read-only language model are shared
+        clone = copy.copy(self)
+        clone.spelling_model = copy.deepcopy(self.spelling_model)
+        clone.grammar_model = copy.deepcopy(self.grammar_model)
+        return clone
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and save the statistical checker models.")
+    parser.add_argument('--artifact-dir', default=DEFAULT_ARTIFACT_DIR, help="Directory for the saved models")
+    parser.add_argument('--retrain', action='store_true', help="Retrain even if an up-to-date artifact exists")
+    parser.add_argument('--online', action='store_true', help="Use the incrementally trained model with hashed features")
+    parser.add_argument('--ingest', nargs='+', metavar='PATH', help="Labeled .jsonl or .tsv files to learn from (implies --online)")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--save-every', type=int, default=10, help="Save a snapshot for running checkers every N batches")
+    args = parser.parse_args()
+
+    if not (args.online or args.ingest):
+        checker = StatisticalChecker(artifact_dir=args.artifact_dir, retrain=args.retrain)
+        print(checker.artifact_path())
+        return
+
+    checker = OnlineStatisticalChecker(artifact_dir=args.artifact_dir, retrain=args.retrain)
+    batches = 0
+    for batch in iter_labeled_batches(args.ingest or [], args.batch_size):
+        start = time.perf_counter()
+        texts, spelling_labels, grammar_labels = zip(*batch)
+        checker.partial_fit(texts, spelling_labels, grammar_labels)
+        batches += 1
+        if batches % args.save_every == 0:
+            checker.save()
+        print(f"batch {batches}: {len(batch)} examples in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{checker.examples_seen} seen", file=sys.stderr)
+    if batches:
+        checker.save()
+    print(checker.artifact_path())
+
+
+if __name__ == "__main__":
+    main()
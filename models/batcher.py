@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    # Collects concurrent single-text requests for up to max_delay seconds and checks them in one check_batch call
+    def __init__(self, check_batch, max_batch_size=64, max_delay=0.005, max_queue=1024, workers=1, name='batcher'):
+        self.check_batch = check_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.workers = workers
+        self.name = name
+
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+        self._stats = {'requests': 0, 'rejected': 0, 'batches': 0, 'batched_items': 0, 'errors': 0, 'busy_seconds': 0.0}
+
+    def start(self):
+        # Everything start() creates, stop() releases, so a stopped batcher can be started again
+        if self._queue is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, text):
+        # Raises asyncio.QueueFull when the queue is at capacity so callers can shed load instead of piling up
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            self._stats['rejected'] += 1
+            raise
+        self._stats['requests'] += 1
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Whatever else is already waiting joins the batch without further delay
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Requests whose caller already gave up (e.g. timed out) are not checked
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.check_batch, [text for text, _ in batch])
+            except Exception as e:
+                self._stats['errors'] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._stats['batches'] += 1
+                self._stats['batched_items'] += len(batch)
+                self._stats['busy_seconds'] += time.perf_counter() - start
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['queue_depth'] = self.queue_depth()
+        stats['mean_batch_size'] = stats['batched_items'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
@@ -0,0 +1,62 @@
+import hashlib
+
+from models.segmenter import segment
+
+# A chunk also ends after any sentence whose hash is divisible by this, about every CUT_EVERY sentences.
+# The cut points depend only on the sentences themselves, so an edit moves no boundary outside its own
+# chunk and the next, and the response cache still answers every other chunk
+CUT_EVERY = 8
+
+
+def estimate_tokens(text):
+    # Rough count for Tamil text: about two characters per token
+    return len(text) // 2 + 1
+
+
+def sentence_spans(text):
+    # (start, end) of every sentence, trailing punctuation and whitespace included. Sentences are the
+    # segmenter's, so cached and chunked results are split exactly as the checkers split them
+    start = 0
+    sentences = segment(text)
+    for sentence in sentences[1:]:
+        yield start, sentence.tokens[0].start
+        start = sentence.tokens[0].start
+    if start < len(text):
+        yield start, len(text)
+
+
+def _split_long_span(text, start, end, max_tokens):
+    # A single sentence over budget is cut at the last whitespace that fits
+    max_chars = max(1, (max_tokens - 1) * 2)
+    while estimate_tokens(text[start:end]) > max_tokens:
+        cut = text.rfind(' ', start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut
+    if start < end:
+        yield start, end
+
+
+def _is_cut_point(sentence):
+    digest = hashlib.blake2b(sentence.strip().encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % CUT_EVERY == 0
+
+
+def chunk_spans(text, max_tokens=512):
+    # Groups whole sentences into chunks under the token budget, ending a chunk early at content-defined
+    # cut points; spans index into text
+    chunk_start = chunk_end = None
+    for start, end in sentence_spans(text):
+        for piece_start, piece_end in _split_long_span(text, start, end, max_tokens):
+            if chunk_start is not None and estimate_tokens(text[chunk_start:piece_end]) <= max_tokens:
+                chunk_end = piece_end
+                continue
+            if chunk_start is not None:
+                yield chunk_start, chunk_end
+            chunk_start, chunk_end = piece_start, piece_end
+        if _is_cut_point(text[start:end]):
+            yield chunk_start, chunk_end
+            chunk_start = chunk_end = None
+    if chunk_start is not None:
+        yield chunk_start, chunk_end
@@ -1,18 +1,22 @@
 import os
-from dotenv import load_dotenv
-from groq import Groq
+import asyncio
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from groq import APIStatusError
+from models.llm_cache import ResponseCache, make_key
+from models.groq_client import AsyncGroqBackend, BackgroundLoop
+from models.chunking import chunk_spans, estimate_tokens
+from models.findings import Finding
+from models.metrics import stage_metrics, timed
 
-load_dotenv()
-
-class GemmaChecker:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables")
-        self.client = Groq(api_key=api_key)
-
-    def get_suggestions(self, tamil_text):
-        prompt = f"""
+MODEL_NAME = "gemma2-9b-it"
+TEMPERATURE = 0.3
+MAX_TOKENS = 2048
+# Longer inputs are split on sentence boundaries and checked chunk by chunk
+MAX_CHUNK_TOKENS = 1024
+SYSTEM_PROMPT = "You are a Tamil language expert who provides detailed corrections and suggestions for Tamil text."
+PROMPT_TEMPLATE = """
         As a Tamil language expert, analyze the following text for spelling and grammatical errors.
         Provide detailed corrections and suggestions in Tamil:
 
@@ -23,35 +27,232 @@ class GemmaChecker:
         2. Specific errors found
         3. Explanation of corrections in Tamil
         """
-        
+
+
+def _load_environment():
+    # .env is read when the first checker is built rather than on import
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _error_code(error):
+    # Groq reports e.g. {"error": {"code": "model_decommissioned", ...}} in the response body
+    if isinstance(error, APIStatusError) and isinstance(error.body, dict):
+        details = error.body.get('error', error.body)
+        if isinstance(details, dict):
+            return details.get('code')
+    return getattr(error, 'code', None)
+
+
+def _error_message(error):
+    if _error_code(error) == 'model_decommissioned':
+        return "Error: The model is no longer supported. Please contact the administrator to update the model."
+    return f"Error getting suggestions: {str(error)}"
+
+
+def _build_messages(tamil_text):
+    return [
+        {
+            "role": "system", 
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user", 
+            "content": PROMPT_TEMPLATE.format(tamil_text=tamil_text)
+        }
+    ]
+
+
+class SuggestionStream:
+    # Iterates over response chunks; text and timings are filled in as the stream is consumed
+    def __init__(self, checker, tamil_text, deadline=None):
+        self.checker = checker
+        self.tamil_text = tamil_text
+        # time.monotonic() value after which the request is abandoned and an error is reported
+        self.deadline = deadline
+        self.text = ""
+        self.cached = False
+        self.time_to_first_token = None
+        self.total_time = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        key = make_key(MODEL_NAME, SYSTEM_PROMPT + PROMPT_TEMPLATE, TEMPERATURE, self.tamil_text)
+        cached = self.checker.cache.get(key)
+        if cached is not None:
+            self.cached = True
+            self.text = cached
+            self.time_to_first_token = self.total_time = time.perf_counter() - start
+            yield cached
+            return
+
+        # An identical request already in flight (streamed or not) is awaited rather than sent again
+        future, owner = self.checker.cache.claim(key)
+        if not owner:
+            yield from self._follow(future, start)
+            return
+
+        chunks = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for delta in self.checker.backend.stream_chat_completion(
+                    model=MODEL_NAME,
+                    messages=_build_messages(self.tamil_text),
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS
+                ):
+                    chunks.put(delta)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(done)
+
+        request = asyncio.run_coroutine_threadsafe(pump(), self.checker._loop.loop)
+        failed = complete = False
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=None if self.deadline is None else max(0, self.deadline - time.monotonic()))
+                except queue.Empty:
+                    failed = True
+                    self.text = "Error: No response before the deadline"
+                    yield "\n\n" + self.text
+                    break
+                if item is done:
+                    complete = not failed
+                    break
+                if isinstance(item, Exception):
+                    # Anything received before the failure is replaced by the error message
+                    failed = True
+                    self.text = _error_message(item)
+                    yield "\n\n" + self.text
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - start
+                self.text += item
+                yield item
+        finally:
+            # A stream abandoned early (deadline, closed generator) stops its request and frees the slot.
+            # Waiting followers get the full text or the error message; only full text is cached
+            request.cancel()
+            if complete or failed:
+                self.checker.cache.settle(key, future, self.text, cache=complete and bool(self.text))
+            else:
+                self.checker.cache.settle(key, future, error=RuntimeError("The request was abandoned before it finished"))
+
+        self.total_time = time.perf_counter() - start
+        if self.time_to_first_token is not None:
+            stage_metrics.observe('groq_first_token', self.time_to_first_token, 'Deep-Learning')
+        stage_metrics.observe('groq', self.total_time, 'Deep-Learning')
+
+    def _follow(self, future, start):
+        try:
+            self.text = future.result(timeout=None if self.deadline is None else max(0, self.deadline - time.monotonic()))
+        except FutureTimeoutError:
+            self.text = "Error: No response before the deadline"
+        except Exception as e:
+            self.text = _error_message(e)
+        self.time_to_first_token = self.total_time = time.perf_counter() - start
+        yield self.text
+
+
+class GemmaChecker:
+    def __init__(self, max_workers=4, cache=None, base_url=None, max_chunk_tokens=MAX_CHUNK_TOKENS, **backend_options):
+        self.max_workers = max_workers
+        self.max_chunk_tokens = max_chunk_tokens
+        # Shared by every caller of this instance; identical texts are answered from the cache
+        self.cache = cache if cache is not None else ResponseCache()
+        _load_environment()
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+        # One pooled, rate-limited async client per checker, driven from a background event loop
+        self.backend = AsyncGroqBackend(api_key=api_key, base_url=base_url or os.getenv("GROQ_BASE_URL"), **backend_options)
+        self._loop = BackgroundLoop()
+
+    def get_suggestions(self, tamil_text):
+        key = make_key(MODEL_NAME, SYSTEM_PROMPT + PROMPT_TEMPLATE, TEMPERATURE, tamil_text)
+        # Error messages are not cached so the next check retries the request
+        return self.cache.get_or_compute(
+            key,
+            lambda: self._request_suggestions(tamil_text),
+            should_cache=lambda response: not response.startswith("Error")
+        )
+
+    def _request_suggestions(self, tamil_text):
+        return self._loop.run(self.aget_suggestions(tamil_text))
+
+    async def aget_suggestions(self, tamil_text):
         try:
-            completion = self.client.chat.completions.create(
-                # Using Mixtral model which is currently supported by Groq
-                model="gemma2-9b-it",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a Tamil language expert who provides detailed corrections and suggestions for Tamil text."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2048
-            )
+            with timed('groq', 'Deep-Learning'):
+                completion = await self.backend.chat_completion(
+                    # Using Mixtral model which is currently supported by Groq
+                    model=MODEL_NAME,
+                    messages=_build_messages(tamil_text),
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS
+                )
             return completion.choices[0].message.content
         except Exception as e:
-            if hasattr(e, 'code') and e.code == 'model_decommissioned':
-                return "Error: The model is no longer supported. Please contact the administrator to update the model."
-            return f"Error getting suggestions: {str(e)}"
+            return _error_message(e)
+
+    def stream_suggestions(self, tamil_text, deadline=None):
+        return SuggestionStream(self, tamil_text, deadline)
+
+    @staticmethod
+    def to_findings(suggestions, text):
+        if suggestions.startswith("Error"):
+            return [Finding.whole("error", suggestions, text)]
+        return [Finding.whole("info", suggestions, text)]
+
+    def backend_metrics(self):
+        return self.backend.metrics()
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def needs_chunking(self, text):
+        return estimate_tokens(text) > self.max_chunk_tokens
+
+    def document_spans(self, text, max_chunk_tokens=None):
+        # The chunks a document is checked in: whole sentences, cut at content-defined points or the token budget
+        return [
+            (start, end) for start, end in chunk_spans(text, max_chunk_tokens or self.max_chunk_tokens)
+            if text[start:end].strip()
+        ]
+
+    def check_document(self, text, max_chunk_tokens=None):
+        # One finding per chunk, spanning the chunk within the original text
+        spans = self.document_spans(text, max_chunk_tokens)
+        if not spans:
+            return []
+
+        # Chunks go out in parallel; the backend's concurrency limit and rate limits still apply
+        with ThreadPoolExecutor(max_workers=min(self.backend.max_concurrency, len(spans))) as executor:
+            responses = list(executor.map(lambda span: self.get_suggestions(text[span[0]:span[1]]), spans))
+
+        findings = []
+        for (start, end), response in zip(spans, responses):
+            error_type = "error" if response.startswith("Error") else "info"
+            findings.append(Finding(error_type, response, start, end, None, text))
+        return findings
 
     def check_text(self, text):
         try:
+            if self.needs_chunking(text):
+                return self.check_document(text)
             suggestions = self.get_suggestions(text)
-            if suggestions.startswith("Error"):
-                return [("error", suggestions, text)]
-            return [("info", suggestions, text)]
+            return self.to_findings(suggestions, text)
         except Exception as e:
-            return [("error", f"Error checking text: {str(e)}", text)]
\ No newline at end of file
+            return [Finding.whole("error", f"Error checking text: {str(e)}", text)]
+
+    def check_texts(self, texts):
+        texts = list(texts)
+        if len(texts) <= 1:
+            return [self.check_text(text) for text in texts]
+
+        # Requests are network bound, so overlap them; map keeps input order
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as executor:
+            return list(executor.map(self.check_text, texts))
@@ -0,0 +1,75 @@
+import sys
+from array import array
+
+FIELDS = ('kind', 'message', 'start', 'end', 'correction')
+
+
+class Finding:
+    # One checker result. The flagged context is text[start:end]; the checked text is referenced, not copied
+    __slots__ = ('kind', 'message', 'start', 'end', 'correction', 'text')
+
+    def __init__(self, kind, message, start, end, correction=None, text=None):
+        # Kinds and messages repeat across findings, so interning keeps one copy of each
+        self.kind = sys.intern(kind)
+        self.message = sys.intern(message) if len(message) < 128 else message
+        self.start = start
+        self.end = end
+        self.correction = correction
+        self.text = text
+
+    @classmethod
+    def whole(cls, kind, message, text, correction=None):
+        # A finding about the entire text, e.g. an error or an LLM response
+        return cls(kind, message, 0, len(text), correction, text)
+
+    @property
+    def context(self):
+        return self.text[self.start:self.end] if self.text is not None else None
+
+    def shifted(self, offset, text):
+        # The same finding relative to a larger text that contains this one at offset
+        return Finding(self.kind, self.message, self.start + offset, self.end + offset, self.correction, text)
+
+    def __iter__(self):
+        # Unpacks like the former (type, message, context, correction, start, end) tuples
+        return iter((self.kind, self.message, self.context, self.correction, self.start, self.end))
+
+    def __eq__(self, other):
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return (self.kind, self.message, self.start, self.end, self.correction, self.context) == \
+            (other.kind, other.message, other.start, other.end, other.correction, other.context)
+
+    def __hash__(self):
+        return hash((self.kind, self.message, self.start, self.end, self.correction))
+
+    def __repr__(self):
+        return (f"Finding({self.kind!r}, {self.message!r}, {self.start}, {self.end}, "
+                f"correction={self.correction!r}, context={self.context!r})")
+
+    def to_dict(self, context=False):
+        record = {field: getattr(self, field) for field in FIELDS}
+        if context:
+            record['context'] = self.context
+        return record
+
+
+def to_records(findings, context=False):
+    return [finding.to_dict(context) for finding in findings]
+
+
+def to_columns(findings):
+    # Column-oriented form for bulk output: one list per field, offsets as int arrays, no per-finding keys
+    findings = list(findings)
+    return {
+        'kind': [finding.kind for finding in findings],
+        'message': [finding.message for finding in findings],
+        'start': array('q', [finding.start for finding in findings]),
+        'end': array('q', [finding.end for finding in findings]),
+        'correction': [finding.correction for finding in findings],
+    }
+
+
+def columns_to_json(columns):
+    return {field: list(values) if isinstance(values, array) else values for field, values in columns.items()}
+
@@ -0,0 +1,24 @@
+import unicodedata
+
+TAMIL_BLOCK = (0x0B80, 0x0BFF)
+ZERO_WIDTH_JOINERS = ('‌', '‍')
+
+
+def is_tamil(text):
+    return any(TAMIL_BLOCK[0] <= ord(char) <= TAMIL_BLOCK[1] for char in text)
+
+
+def _is_combining(char):
+    # Vowel signs and pulli are combining marks (Mn/Mc) that belong to the preceding letter
+    return unicodedata.category(char) in ('Mn', 'Mc') or char in ZERO_WIDTH_JOINERS
+
+
+def split_graphemes(text):
+    # Split into clusters: a base letter followed by its vowel sign and/or pulli
+    clusters = []
+    for char in text:
+        if clusters and _is_combining(char):
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return clusters
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import httpx
+from groq import AsyncGroq, APIConnectionError, APIStatusError
+
+from models.chunking import estimate_tokens
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount=1):
+        # Requests larger than the bucket would never fit, so they wait for a full bucket instead
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def adjust(self, amount):
+        # Positive returns unused tokens; negative charges for usage above the estimate
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class BackgroundLoop:
+    # An event loop on a daemon thread so synchronous callers can share one async client
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='groq-client', daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class AsyncGroqBackend:
+    def __init__(self, api_key, base_url=None, max_concurrency=8, requests_per_minute=30,
+                 tokens_per_minute=15000, max_retries=5, backoff_base=0.5, backoff_max=30.0, timeout=60.0):
+        # Retries are handled here, with rate limiting and jitter, rather than inside the SDK
+        self.client = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+                timeout=timeout
+            )
+        )
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self._semaphore = None
+        self._queued = 0
+        self._in_flight = 0
+        self._latencies = deque(maxlen=1000)
+        self._first_token_latencies = deque(maxlen=1000)
+        self._counters = {'requests': 0, 'retries': 0, 'failures': 0, 'rate_limited': 0}
+
+    @staticmethod
+    def estimate_tokens(messages, max_tokens):
+        # Prompt estimate plus a share of the completion budget; the actual usage is settled after the response
+        return sum(estimate_tokens(message['content']) for message in messages) + max_tokens // 4
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = None
+        if isinstance(error, APIStatusError):
+            retry_after = error.response.headers.get('retry-after')
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, APIConnectionError)
+
+    @asynccontextmanager
+    async def _slot(self):
+        # Bounded concurrency; the recorded latency covers queueing, rate limiting and retries
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        start = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        try:
+            yield start
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+            self._latencies.append(time.perf_counter() - start)
+
+    async def _create(self, estimate, **request):
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire()
+            await self.token_bucket.acquire(estimate)
+            self._counters['requests'] += 1
+            try:
+                return await self.client.chat.completions.create(**request)
+            except Exception as e:
+                if isinstance(e, APIStatusError) and e.status_code == 429:
+                    self._counters['rate_limited'] += 1
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    self._counters['failures'] += 1
+                    raise
+                self._counters['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+
+    async def chat_completion(self, messages, model, temperature, max_tokens, **kwargs):
+        estimate = self.estimate_tokens(messages, max_tokens)
+        async with self._slot():
+            completion = await self._create(
+                estimate,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+
+        usage = getattr(completion, 'usage', None)
+        if usage is not None and getattr(usage, 'total_tokens', None):
+            # Settle the difference between the estimate and the reported usage
+            self.token_bucket.adjust(estimate - usage.total_tokens)
+        return completion
+
+    async def stream_chat_completion(self, messages, model, temperature, max_tokens, **kwargs):
+        # Yields content deltas as they arrive; retries only happen before the first chunk
+        estimate = self.estimate_tokens(messages, max_tokens)
+        async with self._slot() as start:
+            stream = await self._create(
+                estimate,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs
+            )
+            first_token = None
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        self._first_token_latencies.append(first_token - start)
+                    yield delta
+
+    def metrics(self):
+        latencies = list(self._latencies)
+        first_token_latencies = list(self._first_token_latencies)
+        metrics = dict(self._counters)
+        metrics.update({
+            'queue_depth': self._queued,
+            'in_flight': self._in_flight,
+            'latency_p50': _percentile(latencies, 0.5),
+            'latency_p90': _percentile(latencies, 0.9),
+            'latency_p99': _percentile(latencies, 0.99),
+            'first_token_p50': _percentile(first_token_latencies, 0.5),
+            'first_token_p99': _percentile(first_token_latencies, 0.99),
+        })
+        return metrics
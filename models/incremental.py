@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from models.chunking import sentence_spans
+
+
+class SentenceResultCache:
+    # Thread-safe LRU of per-sentence findings keyed by (model name, sentence hash)
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            findings = self._entries.get(key)
+            if findings is not None:
+                self._entries.move_to_end(key)
+            return findings
+
+    def put(self, key, findings):
+        with self._lock:
+            self._entries[key] = findings
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every session in the process
+shared_cache = SentenceResultCache()
+
+
+def sentence_key(model_name, sentence):
+    return model_name, hashlib.sha1(sentence.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(findings):
+    # Failed checks are retried on the next run instead of being remembered
+    return not any(finding.kind in ('error', 'timeout') for finding in findings)
+
+
+class IncrementalChecker:
+    def __init__(self, shared=None, session=None):
+        # Lookups go to the per-session cache first, then to the cache shared by all sessions
+        self.shared = shared if shared is not None else shared_cache
+        self.session = session
+
+    def _get(self, key):
+        if self.session is not None:
+            findings = self.session.get(key)
+            if findings is not None:
+                return findings
+        findings = self.shared.get(key)
+        if findings is not None and self.session is not None:
+            self.session.put(key, findings)
+        return findings
+
+    def store(self, model_name, sentence, findings):
+        key = sentence_key(model_name, sentence)
+        self.shared.put(key, findings)
+        if self.session is not None:
+            self.session.put(key, findings)
+
+    def plan(self, model_name, text):
+        # [start, end, sentence, cached findings or None] for every sentence; offsets exclude surrounding whitespace
+        entries = []
+        for span_start, span_end in sentence_spans(text):
+            raw = text[span_start:span_end]
+            sentence = raw.strip()
+            if not sentence:
+                continue
+            start = span_start + (len(raw) - len(raw.lstrip()))
+            entries.append([start, start + len(sentence), sentence, self._get(sentence_key(model_name, sentence))])
+        return entries
+
+    @staticmethod
+    def merge(entries, text):
+        # Sentence findings are shifted to offsets into text
+        findings = []
+        for start, _, _, sentence_findings in entries:
+            findings.extend(finding.shifted(start, text) for finding in sentence_findings or [])
+        return findings
+
+    def _check(self, model_name, text, check_batch, findings_of):
+        # Fills in the result of every sentence that was not cached; results are stored whole
+        entries = self.plan(model_name, text)
+        missing = [entry for entry in entries if entry[3] is None]
+        if missing:
+            results = check_batch([entry[2] for entry in missing])
+            for entry, result in zip(missing, results):
+                entry[3] = result
+                if is_cacheable(findings_of(result)):
+                    self.store(model_name, entry[2], result)
+
+        stats = {'sentences': len(entries), 'checked': len(missing), 'reused': len(entries) - len(missing)}
+        return entries, stats
+
+    def check(self, model_name, text, check_batch):
+        # check_batch(sentences) -> findings per sentence; only new or edited sentences are sent to it
+        entries, stats = self._check(
+            model_name, text, lambda sentences: [list(findings) for findings in check_batch(sentences)], lambda result: result
+        )
+        return self.merge(entries, text), stats
+
+    def check_scored(self, model_name, text, check_batch):
+        # Like check, for a check_batch that returns (findings, score) per sentence. The score is cached with
+        # the findings and returned for every sentence as (sentence, score)
+        entries, stats = self._check(
+            model_name, text, lambda sentences: [(list(findings), score) for findings, score in check_batch(sentences)],
+            lambda result: result[0]
+        )
+        scores = [(sentence, result[1]) for _, _, sentence, result in entries]
+        findings = self.merge([(start, end, sentence, result[0]) for start, end, sentence, result in entries], text)
+        return findings, scores, stats
@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import chain
+
+# Bump whenever the binary layout changes
+LEXICON_VERSION = 1
+MAGIC = b'TLEX'
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCES = [
+    os.path.join(ROOT_DIR, 'tamil_words.json'),
+    os.path.join(ROOT_DIR, 'data', 'tamil_words.txt'),
+]
+DEFAULT_LEXICON_DIR = os.path.join(ROOT_DIR, 'artifacts', 'lexicon')
+
+# POS tags for the groups in tamil_words.json
+JSON_GROUP_TAGS = {
+    'pronouns': 'pronoun',
+    'verbs': 'verb',
+    'nouns': 'noun',
+    'adjectives': 'adjective',
+    'common_words': 'common',
+    'colloquial_forms': 'colloquial',
+}
+WORD_PATTERN = re.compile(r'[^\s.,!?।;:"\'()]+')
+
+
+def _read_source(path):
+    # Yields (word, pos) pairs; plain word lists carry no POS tag
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            groups = json.load(f)
+        for group, words in groups.items():
+            tag = JSON_GROUP_TAGS.get(group, group)
+            for word in words:
+                yield word.strip(), tag
+    else:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                for word in WORD_PATTERN.findall(line):
+                    yield word, None
+
+
+def compile_lexicon(entries, output_path):
+    # entries: iterable of (word, pos); the first tag seen for a word wins
+    tags = {}
+    for word, pos in entries:
+        if not word:
+            continue
+        if tags.get(word) is None:
+            tags[word] = pos
+
+    words = sorted(tags, key=lambda w: w.encode('utf-8'))
+    pos_table = [''] + sorted({pos for pos in tags.values() if pos})
+    pos_ids = {pos: i for i, pos in enumerate(pos_table)}
+
+    pool = bytearray()
+    offsets = array('I', [0])
+    for word in words:
+        pool += word.encode('utf-8')
+        offsets.append(len(pool))
+    pos_array = array('B', (pos_ids[tags[word] or ''] for word in words))
+
+    # Reversed spellings, sorted, for suffix queries
+    reversed_order = sorted(range(len(words)), key=lambda i: words[i][::-1].encode('utf-8'))
+    reversed_pool = bytearray()
+    reversed_offsets = array('I', [0])
+    for i in reversed_order:
+        reversed_pool += words[i][::-1].encode('utf-8')
+        reversed_offsets.append(len(reversed_pool))
+    reversed_ids = array('I', reversed_order)
+
+    sections = [
+        ('offsets', offsets.tobytes()),
+        ('reversed_offsets', reversed_offsets.tobytes()),
+        ('reversed_ids', reversed_ids.tobytes()),
+        ('pos', pos_array.tobytes()),
+        ('pool', bytes(pool)),
+        ('reversed_pool', bytes(reversed_pool)),
+    ]
+    header = {'version': LEXICON_VERSION, 'count': len(words), 'pos_table': pos_table}
+    return write_sections(output_path, MAGIC, header, sections)
+
+
+def write_sections(output_path, magic, header, sections):
+    # Shared binary layout: magic, JSON header, then named 8-byte aligned sections.
+    # The header records where each section starts
+    header = dict(header, byteorder=sys.byteorder)
+    position = 0
+    layout = {}
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + (-len(data) % 8)
+    header['sections'] = layout
+    header['data_start'] = 0
+    # Leave room for the data_start value itself, then pad the header to an 8-byte boundary
+    data_start = 8 + len(json.dumps(header, ensure_ascii=False).encode('utf-8')) + 16
+    data_start += -data_start % 8
+    header['data_start'] = data_start
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_bytes += b' ' * (data_start - 8 - len(header_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(magic + struct.pack('<I', len(header_bytes)) + header_bytes)
+            for _, data in sections:
+                f.write(data + b'\0' * (-len(data) % 8))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def map_sections(path, magic, version):
+    # Returns (mmap, header, section) where section(name, fmt) is a zero-copy view of that section
+    with open(path, 'rb') as f:
+        # Read-only mapping: pages are shared by every process that opens the same file
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(magic)] != magic:
+        raise ValueError(f"Unrecognised file format: {path}")
+    header_length = struct.unpack('<I', mapped[4:8])[0]
+    header = json.loads(bytes(mapped[8:8 + header_length]).decode('utf-8'))
+    if header['version'] != version or header['byteorder'] != sys.byteorder:
+        raise ValueError(f"Incompatible file version: {path}")
+    view = memoryview(mapped)
+
+    def section(name, fmt=None):
+        start, length = header['sections'][name]
+        start += header['data_start']
+        data = view[start:start + length]
+        return data.cast(fmt) if fmt else data
+
+    return mapped, header, section
+
+
+class _SortedPool:
+    # Sorted byte strings stored back to back in a pool, addressed by an offsets array
+    def __init__(self, pool, offsets):
+        self._pool = pool
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self._pool[self._offsets[i]:self._offsets[i + 1]])
+
+    def lower_bound(self, key):
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self[mid] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def prefix_range(self, prefix):
+        # 0xFF never occurs in UTF-8, so it sorts after every string that starts with prefix
+        return self.lower_bound(prefix), self.lower_bound(prefix + b'\xff')
+
+
+class Lexicon:
+    def __init__(self, path):
+        self.path = path
+        self._mmap, header, section = map_sections(path, MAGIC, LEXICON_VERSION)
+        self.pos_table = header['pos_table']
+        self._count = header['count']
+
+        self._words = _SortedPool(section('pool'), section('offsets', 'I'))
+        self._reversed = _SortedPool(section('reversed_pool'), section('reversed_offsets', 'I'))
+        self._reversed_ids = section('reversed_ids', 'I')
+        self._pos = section('pos')
+
+    @staticmethod
+    def fingerprint(sources):
+        # Size and mtime are enough to notice edited word lists without reading them
+        payload = [LEXICON_VERSION]
+        for path in sources:
+            stat = os.stat(path)
+            payload.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def load_or_compile(cls, sources=None, extra_entries=None, lexicon_dir=DEFAULT_LEXICON_DIR):
+        sources = [path for path in (sources or DEFAULT_SOURCES) if os.path.exists(path)]
+        extra_entries = list(extra_entries or [])
+        key = cls.fingerprint(sources) + hashlib.sha256(
+            json.dumps(extra_entries, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:8]
+        path = os.path.join(lexicon_dir, f'lexicon-v{LEXICON_VERSION}-{key}.bin')
+        if not os.path.exists(path):
+            try:
+                compile_lexicon(chain(extra_entries, *(_read_source(source) for source in sources)), path)
+            except OSError:
+                # A read-only deployment builds a private copy instead
+                return cls.from_entries(chain(extra_entries, *(_read_source(source) for source in sources)))
+        return cls(path)
+
+    @classmethod
+    def from_entries(cls, entries):
+        # A lexicon that is not cached on disk; the mapping outlives the deleted temporary file
+        fd, path = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        try:
+            compile_lexicon(entries, path)
+            return cls(path)
+        finally:
+            os.remove(path)
+
+    def _find(self, word):
+        key = word.encode('utf-8')
+        i = self._words.lower_bound(key)
+        if i < self._count and self._words[i] == key:
+            return i
+        return -1
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self._find(word) >= 0
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._words[i].decode('utf-8')
+
+    def __getitem__(self, word):
+        i = self._find(word)
+        if i < 0:
+            raise KeyError(word)
+        return self.pos_table[self._pos[i]] or None
+
+    def get(self, word, default=None):
+        i = self._find(word)
+        if i < 0:
+            return default
+        return self.pos_table[self._pos[i]] or None
+
+    def words_with_prefix(self, prefix, limit=None):
+        start, end = self._words.prefix_range(prefix.encode('utf-8'))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._words[i].decode('utf-8') for i in range(start, end)]
+
+    def words_with_suffix(self, suffix, limit=None):
+        start, end = self._reversed.prefix_range(suffix[::-1].encode('utf-8'))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._words[self._reversed_ids[i]].decode('utf-8') for i in range(start, end)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile word lists into a memory-mapped lexicon file.")
+    parser.add_argument('sources', nargs='*', default=DEFAULT_SOURCES, help="JSON (POS groups) or plain text word lists")
+    parser.add_argument('--output', required=True, help="Path of the compiled lexicon")
+    args = parser.parse_args()
+
+    entries = (entry for source in args.sources for entry in _read_source(source))
+    path = compile_lexicon(entries, args.output)
+    print(f"{path}: {len(Lexicon(path))} words")
+
+
+if __name__ == "__main__":
+    main()
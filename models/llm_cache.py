@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts', 'llm_cache.sqlite3')
+
+
+def normalize_text(text):
+    # Equivalent spellings and spacing should share one cache entry
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def make_key(model, prompt_template, temperature, text):
+    payload = json.dumps([model, prompt_template, temperature, normalize_text(text)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=512, ttl=7 * 24 * 3600, max_disk_bytes=64 * 2 ** 20):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'deduplicated': 0, 'evictions': 0}
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, '
+                    'accessed REAL NOT NULL, size INTEGER NOT NULL)'
+                )
+                self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            except sqlite3.Error:
+                # The in-memory tier still works without a writable disk
+                self._db = None
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            if time.time() - created > self.ttl:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key, value, created):
+        with self._lock:
+            self._memory[key] = (value, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _disk_get(self, key):
+        if self._db is None:
+            return None
+        now = time.time()
+        with self._db_lock:
+            row = self._db.execute('SELECT value, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return row
+
+    def _disk_put(self, key, value, created):
+        if self._db is None:
+            return
+        size = len(value.encode('utf-8'))
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)',
+                (key, value, created, created, size)
+            )
+            self._evict_disk()
+
+    def _evict_disk(self):
+        # Drop expired rows, then the least recently used ones until the size budget is met
+        self._db.execute('DELETE FROM responses WHERE created < ?', (time.time() - self.ttl,))
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        while total > self.max_disk_bytes:
+            row = self._db.execute('SELECT key, size FROM responses ORDER BY accessed LIMIT 1').fetchone()
+            if row is None:
+                break
+            self._db.execute('DELETE FROM responses WHERE key = ?', (row[0],))
+            total -= row[1]
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        value = self._memory_get(key)
+        if value is not None:
+            with self._lock:
+                self._stats['memory_hits'] += 1
+            return value
+
+        row = self._disk_get(key)
+        if row is not None:
+            self._memory_put(key, row[0], row[1])
+            with self._lock:
+                self._stats['disk_hits'] += 1
+            return row[0]
+        return None
+
+    def put(self, key, value):
+        created = time.time()
+        self._memory_put(key, value, created)
+        self._disk_put(key, value, created)
+
+    def claim(self, key):
+        # (future, owner): the first caller for a key owns the request and must settle() it; identical
+        # requests made meanwhile get the owner's future to wait on instead of calling again
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['deduplicated'] += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            self._stats['misses'] += 1
+            return future, True
+
+    def settle(self, key, future, value=None, error=None, cache=True):
+        # Stored before the key leaves _inflight, so later callers find it in the cache
+        try:
+            if error is None and cache:
+                self.put(key, value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    def get_or_compute(self, key, compute, should_cache=lambda value: True):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        future, owner = self.claim(key)
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, value, cache=should_cache(value))
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses'] + stats['deduplicated']
+        stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+        if self._db is not None:
+            with self._db_lock:
+                stats['disk_entries'], stats['disk_bytes'] = self._db.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+                ).fetchone()
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM responses')
@@ -0,0 +1,211 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from sub-millisecond regex work to slow LLM calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_NAME = 'tamil_checker_stage_seconds'
+BACKEND_METRIC_PREFIX = 'tamil_checker_backend'
+# (key in a backend's metrics(), Prometheus type, help text); latencies are exported as quantile gauges
+BACKEND_SERIES = (
+    ('requests', 'counter', 'Requests sent to the LLM backend, retries included.'),
+    ('retries', 'counter', 'LLM requests retried after a retryable error.'),
+    ('failures', 'counter', 'LLM calls that failed after their last attempt.'),
+    ('rate_limited', 'counter', 'LLM requests answered with HTTP 429.'),
+    ('queue_depth', 'gauge', 'LLM calls waiting for a concurrency slot.'),
+    ('in_flight', 'gauge', 'LLM calls holding a concurrency slot.'),
+)
+BACKEND_QUANTILES = (
+    ('latency_p', 'latency_seconds', 'LLM call latency including queueing and retries, recent calls.'),
+    ('first_token_p', 'first_token_seconds', 'Time to the first streamed token, recent calls.'),
+)
+PROFILE_ENV = 'CHECKER_PROFILE'
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf bucket; counts are not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction):
+        # Linear interpolation inside the bucket that holds the requested rank
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class StageMetrics:
+    # Per-(checker, stage) latency histograms, shared by every thread in the process
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.enabled = True
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, checker=''):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get((checker, stage))
+            if histogram is None:
+                histogram = self._histograms[(checker, stage)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage, checker=''):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, checker)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_json(self):
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [
+                {
+                    'checker': checker,
+                    'stage': stage,
+                    'count': histogram.count,
+                    'sum_seconds': histogram.sum,
+                    'mean_seconds': histogram.sum / histogram.count,
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p99_seconds': histogram.quantile(0.99),
+                    'buckets': dict(zip([str(b) for b in histogram.buckets] + ['+Inf'], histogram.counts)),
+                }
+                for (checker, stage), histogram in items
+            ]
+
+    def to_prometheus(self):
+        lines = [
+            f'# HELP {METRIC_NAME} Time spent in each checker stage.',
+            f'# TYPE {METRIC_NAME} histogram',
+        ]
+        with self._lock:
+            for (checker, stage), histogram in sorted(self._histograms.items()):
+                labels = f'checker="{checker}",stage="{stage}"'
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{METRIC_NAME}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def backends_to_prometheus(backends):
+    # backends maps a checker name to the metrics() of its LLM backend
+    lines = []
+    for key, kind, description in BACKEND_SERIES:
+        name = f'{BACKEND_METRIC_PREFIX}_{key}_total' if kind == 'counter' else f'{BACKEND_METRIC_PREFIX}_{key}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        for checker, metrics in sorted(backends.items()):
+            if metrics.get(key) is not None:
+                lines.append(f'{name}{{checker="{checker}"}} {metrics[key]}')
+    for prefix, suffix, description in BACKEND_QUANTILES:
+        name = f'{BACKEND_METRIC_PREFIX}_{suffix}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge']
+        for checker, metrics in sorted(backends.items()):
+            for key, value in sorted(metrics.items()):
+                if key.startswith(prefix) and value is not None:
+                    quantile = int(key[len(prefix):]) / 100
+                    lines.append(f'{name}{{checker="{checker}",quantile="{quantile:g}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+# Process-wide instance used by the checker hooks
+stage_metrics = StageMetrics()
+
+
+def timed(stage, checker=''):
+    return stage_metrics.time(stage, checker)
+
+
+class SamplingProfiler:
+    # Samples the stacks of all other threads at a fixed interval; costs nothing while stopped
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        self._stacks.clear()
+        self.samples = 0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                self._stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        # One "frame;frame;frame count" line per stack, the input format of flame graph tools
+        return '\n'.join(f'{stack} {count}' for stack, count in self._stacks.most_common())
+
+    def top_functions(self, limit=20):
+        leaves = Counter()
+        for stack, count in list(self._stacks.items()):
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+profiler = SamplingProfiler()
+
+
+def start_profiler_from_env():
+    # CHECKER_PROFILE=1 turns on sampling at startup; CHECKER_PROFILE_INTERVAL sets the interval in seconds
+    if os.getenv(PROFILE_ENV, '0') not in ('', '0'):
+        profiler.interval = float(os.getenv(PROFILE_ENV + '_INTERVAL', profiler.interval))
+        profiler.start()
+    return profiler
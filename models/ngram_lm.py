@@ -0,0 +1,269 @@
+import argparse
+import math
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from models.lexicon import _SortedPool, write_sections, map_sections
+from models.segmenter import iter_sentences, segment
+
+# Bump whenever the binary layout changes
+LM_VERSION = 1
+MAGIC = b'TNGM'
+DEFAULT_LM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts', 'ngram', 'tamil.lm')
+
+UNK, BOS, EOS = 0, 1, 2
+SPECIAL_TOKENS = ['<unk>', '<s>', '</s>']
+# Stupid backoff (Brants et al., 2007): an unseen n-gram scores as its shorter context times 0.4
+BACKOFF_LOG10 = math.log10(0.4)
+# Scores are log10 values quantized to one byte over [-QUANT_RANGE, 0]; the step is about 0.03
+QUANT_RANGE = 8.0
+QUANT_LEVELS = 255
+LEVELS = [-(level * QUANT_RANGE / QUANT_LEVELS) for level in range(QUANT_LEVELS + 1)]
+# Word frequencies are Zipfian, so a small cache in front of the vocabulary search absorbs most lookups
+WORD_ID_CACHE = 65536
+
+# Verb person/number/gender endings and case markers split off in morpheme mode. All start with a
+# consonant, so the split always falls on a grapheme boundary
+MORPHEME_SUFFIXES = sorted([
+    'கிறேன்', 'கிறோம்', 'கிறாய்', 'கிறீர்கள்', 'கிறான்', 'கிறாள்', 'கிறார்', 'கிறார்கள்', 'கிறது', 'கின்றன',
+    'ந்தேன்', 'ந்தோம்', 'ந்தான்', 'ந்தாள்', 'ந்தார்கள்', 'த்தேன்', 'த்தோம்', 'த்தான்', 'த்தாள்', 'த்தார்கள்',
+    'வேன்', 'வோம்', 'வான்', 'வாள்', 'வார்கள்',
+    'க்கு', 'த்தில்', 'யில்', 'வில்', 'த்தை', 'டன்',
+], key=len, reverse=True)
+MIN_STEM = 2
+
+
+def split_morphemes(word):
+    # Longest known suffix, marked with a leading "+" so it never collides with a whole word
+    for suffix in MORPHEME_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return [word[:-len(suffix)], '+' + suffix]
+    return [word]
+
+
+def to_units(words, units):
+    if units == 'word':
+        return list(words)
+    return [unit for word in words for unit in split_morphemes(word)]
+
+
+def _corpus_sentences(paths, units):
+    # Unit lists per sentence, streamed so a corpus file is never held in memory whole
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for sentence in iter_sentences(f):
+                tokens = to_units((token.text for token in sentence.words()), units)
+                if tokens:
+                    yield tokens
+
+
+def _pack(ids, bits):
+    key = 0
+    for word_id in ids:
+        key = (key << bits) | word_id
+    return key
+
+
+def _quantize(log10):
+    return round(min(-log10, QUANT_RANGE) / QUANT_RANGE * QUANT_LEVELS)
+
+
+def compile_language_model(paths, output_path, order=3, units='word', min_count=1):
+    # Two streaming passes over the corpus files: the vocabulary first, then n-gram counts over word ids
+    if order < 2:
+        raise ValueError("order must be at least 2")
+    if units not in ('word', 'morpheme'):
+        raise ValueError(f"Unknown units: {units}")
+
+    word_counts = Counter()
+    sentences = 0
+    for tokens in _corpus_sentences(paths, units):
+        word_counts.update(tokens)
+        sentences += 1
+
+    # Ids follow the byte order of the vocabulary pool, so an id is its rank after the special tokens
+    vocab = sorted(word_counts, key=lambda w: w.encode('utf-8'))
+    bits = 64 // order
+    if len(vocab) + len(SPECIAL_TOKENS) > 2 ** bits:
+        raise ValueError(f"{len(vocab)} words do not fit {bits}-bit ids; use a lower order")
+    ids = {word: i + len(SPECIAL_TOKENS) for i, word in enumerate(vocab)}
+
+    # counts[n] holds packed n-gram keys; counts[1] is indexed by id
+    counts = {n: Counter() for n in range(2, order + 1)}
+    counts[1] = Counter({BOS: sentences, EOS: sentences})
+    for word, count in word_counts.items():
+        counts[1][ids[word]] = count
+    for tokens in _corpus_sentences(paths, units):
+        sequence = [BOS] + [ids[token] for token in tokens] + [EOS]
+        for n in range(2, order + 1):
+            counter = counts[n]
+            for i in range(len(sequence) - n + 1):
+                counter[_pack(sequence[i:i + n], bits)] += 1
+
+    # BOS is never predicted, so it is left out of the unigram total
+    total = sum(word_counts.values()) + sentences
+    unigrams = array('B', [QUANT_LEVELS] * (len(vocab) + len(SPECIAL_TOKENS)))
+    for word_id, count in counts[1].items():
+        if word_id != BOS:
+            unigrams[word_id] = _quantize(math.log10(count / total))
+
+    pool = bytearray()
+    offsets = array('I', [0])
+    for word in vocab:
+        pool += word.encode('utf-8')
+        offsets.append(len(pool))
+
+    sections = [('offsets', offsets.tobytes()), ('unigrams', unigrams.tobytes())]
+    ngram_counts = {1: len(vocab)}
+    context_mask = (1 << bits * (order - 1)) - 1
+    for n in range(2, order + 1):
+        context_counts = counts[n - 1]
+        keys = array('Q')
+        scores = array('B')
+        for key in sorted(counts[n]):
+            count = counts[n][key]
+            if count < min_count:
+                continue
+            # Score: log10 count(context + word) / count(context)
+            context = (key >> bits) & context_mask
+            keys.append(key)
+            scores.append(_quantize(math.log10(count / context_counts[context])))
+        sections += [(f'keys{n}', keys.tobytes()), (f'scores{n}', scores.tobytes())]
+        ngram_counts[n] = len(keys)
+    sections.append(('pool', bytes(pool)))
+
+    header = {
+        'version': LM_VERSION,
+        'order': order,
+        'units': units,
+        'bits': bits,
+        'vocab_size': len(vocab),
+        'ngrams': ngram_counts,
+        'sentences': sentences,
+        'tokens': total - sentences,
+        # An unknown word scores as one occurrence below the rarest word
+        'unk_log10': math.log10(0.5 / total),
+    }
+    return write_sections(output_path, MAGIC, header, sections)
+
+
+class NgramLanguageModel:
+    # Memory-mapped n-gram model: sorted 64-bit n-gram keys and one-byte quantized scores per order
+    def __init__(self, path):
+        self.path = path
+        self._mmap, header, section = map_sections(path, MAGIC, LM_VERSION)
+        self.order = header['order']
+        self.units = header['units']
+        self.ngram_counts = {int(n): count for n, count in header['ngrams'].items()}
+        self._bits = header['bits']
+        self._unk_log10 = header['unk_log10']
+        self._vocab = _SortedPool(section('pool'), section('offsets', 'I'))
+        self._unigrams = section('unigrams')
+        self._keys = {n: section(f'keys{n}', 'Q') for n in range(2, self.order + 1)}
+        self._scores = {n: section(f'scores{n}') for n in range(2, self.order + 1)}
+        self.word_id = lru_cache(maxsize=WORD_ID_CACHE)(self._word_id)
+
+    @classmethod
+    def load_default(cls, path=DEFAULT_LM_PATH):
+        # Checkers run without a language model until one has been compiled
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def size_bytes(self):
+        return len(self._mmap)
+
+    def _word_id(self, word):
+        key = word.encode('utf-8')
+        i = self._vocab.lower_bound(key)
+        if i < len(self._vocab) and self._vocab[i] == key:
+            return i + len(SPECIAL_TOKENS)
+        return UNK
+
+    def _log10(self, history, word_id):
+        # Longest matching context first; each step down costs BACKOFF_LOG10
+        backoff = 0.0
+        for n in range(min(self.order, len(history) + 1), 1, -1):
+            key = _pack(history[len(history) - n + 1:] + [word_id], self._bits)
+            keys = self._keys[n]
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                return LEVELS[self._scores[n][i]] + backoff
+            backoff += BACKOFF_LOG10
+        if word_id == UNK:
+            return self._unk_log10 + backoff
+        return LEVELS[self._unigrams[word_id]] + backoff
+
+    def score_units(self, units, bos=True, eos=True):
+        # log10 score of every unit (and of the sentence end when eos is set)
+        history = [BOS] if bos else []
+        scores = []
+        for word_id in [self.word_id(unit) for unit in units] + ([EOS] if eos else []):
+            scores.append(self._log10(history, word_id))
+            history.append(word_id)
+            if len(history) >= self.order:
+                del history[0]
+        return scores
+
+    def word_scores(self, text):
+        # (token, log10) for every word token of text; in morpheme mode a word scores the sum of its units
+        results = []
+        for sentence in segment(text):
+            words = sentence.words()
+            pieces = [to_units([token.text], self.units) for token in words]
+            scores = self.score_units([unit for piece in pieces for unit in piece])
+            position = 0
+            for token, piece in zip(words, pieces):
+                results.append((token, sum(scores[position:position + len(piece)])))
+                position += len(piece)
+        return results
+
+    def score(self, text):
+        # (total log10, number of scored units) over every sentence of text
+        total = 0.0
+        count = 0
+        for sentence in segment(text):
+            scores = self.score_units(to_units((token.text for token in sentence.words()), self.units))
+            total += sum(scores)
+            count += len(scores)
+        return total, count
+
+    def perplexity(self, text):
+        total, count = self.score(text)
+        return 10 ** (-total / count) if count else None
+
+    def rank_candidates(self, left, candidates, right=()):
+        # Candidates for one word ranked by the log10 score of the window they change, best first.
+        # left/right are the neighbouring words of the same sentence; only order-1 of each are used
+        context = self.order - 1
+        left = to_units(list(left)[-context:], self.units)[-context:]
+        right = to_units(list(right)[:context], self.units)[:context]
+        bos = len(left) < context
+        eos = len(right) < context
+        ranked = []
+        for candidate in candidates:
+            scores = self.score_units(left + to_units([candidate], self.units) + right, bos, eos)
+            ranked.append((candidate, sum(scores[len(left):])))
+        ranked.sort(key=lambda item: -item[1])
+        return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train an n-gram language model from corpus files into a memory-mapped model file.")
+    parser.add_argument('corpus', nargs='+', help="Plain text corpus files")
+    parser.add_argument('--output', default=DEFAULT_LM_PATH, help="Path of the compiled model")
+    parser.add_argument('--order', type=int, default=3)
+    parser.add_argument('--units', choices=['word', 'morpheme'], default='word', help="Model whole words or stems and suffixes")
+    parser.add_argument('--min-count', type=int, default=1, help="Drop higher-order n-grams seen fewer times")
+    args = parser.parse_args()
+
+    path = compile_language_model(args.corpus, args.output, args.order, args.units, args.min_count)
+    model = NgramLanguageModel(path)
+    print(f"{path}: {model.ngram_counts} n-grams, {model.size_bytes() / 2 ** 20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import importlib.util
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Per-model deadlines in seconds; a model that misses its deadline reports a timeout result
+MODEL_TIMEOUTS = {
+    'Rule-based': 10,
+    'ML': 30,
+    'Deep-Learning': 60
+}
+
+# The module each model's backend needs and the requirements file that installs it
+MODEL_EXTRAS = {
+    'Rule-based': ('Levenshtein', 'requirements/base.txt'),
+    'ML': ('sklearn', 'requirements/ml.txt'),
+    'Deep-Learning': ('groq', 'requirements/llm.txt'),
+}
+
+# CHECKER_ML_MODE=online serves the incrementally trained statistical model
+ML_MODE_ENV = 'CHECKER_ML_MODE'
+
+
+def _build_rule_based():
+    from models.rule_based_model import RuleBasedChecker
+    return RuleBasedChecker()
+
+
+def _build_statistical():
+    if os.environ.get(ML_MODE_ENV) == 'online':
+        from models.ML_model import OnlineStatisticalChecker
+        return OnlineStatisticalChecker()
+    from models.ML_model import StatisticalChecker
+    return StatisticalChecker()
+
+
+def _build_gemma():
+    from models.deep_Learning_model import GemmaChecker
+    return GemmaChecker()
+
+
+class ModelRegistry:
+    def __init__(self, factories):
+        self._factories = dict(factories)
+        self._instances = {}
+        # Bumped whenever a model is replaced, so results cached from the old instance can be told apart
+        self._generations = dict.fromkeys(self._factories, 0)
+        # One lock per model so a slow build (e.g. training) does not block the others
+        self._locks = {name: threading.Lock() for name in self._factories}
+
+    def names(self):
+        return list(self._factories)
+
+    def get(self, name):
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+
+        instance = self._instances.get(name)
+        if instance is not None:
+            # Models that learn online report when a newer snapshot has been saved
+            is_stale = getattr(instance, 'is_stale', None)
+            if is_stale is not None and is_stale():
+                self._rebuild_in_background(name, instance)
+            return instance
+
+        with self._locks[name]:
+            # Another thread may have finished building while we waited
+            instance = self._instances.get(name)
+            if instance is None:
+                try:
+                    instance = self._factories[name]()
+                except ModuleNotFoundError as e:
+                    if name not in MODEL_EXTRAS:
+                        raise
+                    raise ModuleNotFoundError(
+                        f"The {name} model needs {e.name}; install it with pip install -r {MODEL_EXTRAS[name][1]}",
+                        name=e.name
+                    ) from e
+                self._instances[name] = instance
+        return instance
+
+    def _rebuild_in_background(self, name, stale):
+        # Builds the model again from its latest saved state on a worker thread. Requests keep getting the
+        # stale instance until the new one is in place, and a failed build leaves it in service
+        lock = self._locks[name]
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(target=self._rebuild, args=(name, stale), name=f'rebuild-{name}', daemon=True).start()
+        except Exception:
+            lock.release()
+            raise
+
+    def _rebuild(self, name, stale):
+        # Runs on the worker thread, which owns the model's lock until it finishes
+        try:
+            if self._instances.get(name) is stale:
+                self._instances[name] = self._factories[name]()
+                self._generations[name] += 1
+        except Exception:
+            logger.exception("Rebuilding the %s model failed; the stale instance stays in service", name)
+        finally:
+            self._locks[name].release()
+
+    def replace(self, name, instance):
+        # Hot swap: calls already running finish on the instance they started with, later get() calls see the new one
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+        with self._locks[name]:
+            self._instances[name] = instance
+            self._generations[name] += 1
+
+    def generation(self, name):
+        return self._generations[name]
+
+    def is_available(self, name):
+        # Whether the optional backend is installed, checked without importing it
+        if name not in MODEL_EXTRAS:
+            return name in self._factories
+        return importlib.util.find_spec(MODEL_EXTRAS[name][0]) is not None
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def reset(self, name=None):
+        names = [name] if name else self.names()
+        for model_name in names:
+            with self._locks[model_name]:
+                self._instances.pop(model_name, None)
+                self._generations[model_name] += 1
+
+
+# Process-wide registry, shared by every Streamlit rerun and session
+registry = ModelRegistry({
+    'Rule-based': _build_rule_based,
+    'ML': _build_statistical,
+    'Deep-Learning': _build_gemma,
+})
@@ -1,10 +1,28 @@
 import re
-from indicnlp.tokenize.indic_tokenize import trivial_tokenize
+from bisect import bisect_right
 from collections import defaultdict
+from models.rule_matcher import SpellingRuleMatcher, AgreementRuleMatcher
+from models.graphemes import is_tamil, split_graphemes
+from models.segmenter import segment
+from models.spell_index import SpellingIndex
+from models.lexicon import Lexicon
+from models.ngram_lm import NgramLanguageModel, DEFAULT_LM_PATH
+from models.findings import Finding
+from models.metrics import timed
+
+# Tie-break for fixes that cover the same span: grammar fixes are applied in preference to spelling fixes
+CORRECTION_PRIORITY = {'grammar': 0, 'spelling': 1}
+# Noisy-channel cost of one edit, in log10, when the language model ranks spelling candidates
+EDIT_LOG10 = -2.0
+
 
 class RuleBasedChecker:
-    def __init__(self):
+    def __init__(self, lm_path=DEFAULT_LM_PATH):
         self.tamil_words = self._load_tamil_dictionary()
+        # Built once per lexicon and cached on disk
+        self.spelling_index = SpellingIndex.load_or_build(self.tamil_words)
+        # Ranks spelling candidates by their neighbours when a model has been compiled; None otherwise
+        self.language_model = NgramLanguageModel.load_default(lm_path)
         
         # Expanded grammar rules with patterns and corrections
         self.grammar_rules = {
@@ -22,6 +40,12 @@ class RuleBasedChecker:
                 (r'பயன்படுத்திறேன்', 'Possible misspelling of பயன்படுத்துகிறேன்', 'பயன்படுத்துகிறேன்'),
             ]
         }
+        self._compile_rules()
+
+    def _compile_rules(self):
+        # Compile the rule tables once into automata so each token and sentence is scanned a single time
+        self._spelling_matcher = SpellingRuleMatcher(self.grammar_rules['spelling_patterns'])
+        self._grammar_matcher = AgreementRuleMatcher(self.grammar_rules['subject_verb_agreement'])
 
     def _load_tamil_dictionary(self):
         basic_dictionary = {
@@ -45,74 +69,149 @@ class RuleBasedChecker:
             'வைக்கிறான்': 'verb',
             'பயன்படுத்துகிறேன்': 'verb',
         }
-        return basic_dictionary
+        # Compiled with the word lists in data/ into a memory-mapped lexicon; built-in tags take precedence
+        return Lexicon.load_or_compile(extra_entries=basic_dictionary.items())
+
+    def sentence_spans(self, text):
+        # (start, end) of every non-empty sentence, without the boundary mark
+        return [(sentence.start, sentence.end) for sentence in segment(text)]
 
     def split_sentences(self, text):
-        sentences = re.split('[.!?।]', text)
-        return [s.strip() for s in sentences if s.strip()]
+        return [text[start:end] for start, end in self.sentence_spans(text)]
+
+    def suggest_corrections(self, word, top_k=5):
+        if not is_tamil(word):
+            return []
+        # Short words get a tighter edit budget so they are not "corrected" into unrelated words
+        max_distance = 1 if len(split_graphemes(word)) <= 3 else 2
+        return self.spelling_index.suggest(word, top_k, max_distance)
+
+    def best_correction(self, word, left=(), right=()):
+        if self.language_model is None:
+            suggestions = self.suggest_corrections(word, top_k=1)
+            return suggestions[0][0] if suggestions else None
+
+        # Noisy channel: the candidate's score in context plus EDIT_LOG10 per edit
+        distances = dict(self.suggest_corrections(word))
+        if not distances:
+            return None
+        ranked = self.language_model.rank_candidates(left, distances, right)
+        return max(ranked, key=lambda item: item[1] + distances[item[0]] * EDIT_LOG10)[0]
+
+    def _neighbours(self, words, i):
+        # The words around words[i] that the language model conditions on
+        if self.language_model is None:
+            return (), ()
+        context = self.language_model.order - 1
+        return [token.text for token in words[max(0, i - context):i]], [token.text for token in words[i + 1:i + 1 + context]]
+
+    def _segment(self, text, sentences):
+        # Callers that check both spelling and grammar segment once and pass the sentences to each
+        if sentences is None:
+            with timed('tokenize', 'Rule-based'):
+                sentences = segment(text)
+        return sentences
 
-    def check_spelling(self, text):
+    def check_spelling(self, text, sentences=None):
         corrections = []
-        words = trivial_tokenize(text)
+        sentences = self._segment(text, sentences)
         
-        for word in words:
-            for pattern, msg, correction in self.grammar_rules['spelling_patterns']:
-                if re.search(pattern, word):
-                    corrections.append(('spelling', msg, word, correction))
-            
-            if word not in self.tamil_words and not any(char.isdigit() for char in word):
-                corrections.append(('spelling', f'Unknown word: {word}', word, None))
+        with timed('spelling_lookup', 'Rule-based'):
+            for sentence in sentences:
+                words = sentence.words()
+                for i, token in enumerate(words):
+                    word, start, end = token.text, token.start, token.end
+                    for pattern, msg, correction in self._spelling_matcher.matching_rules(word):
+                        corrections.append(Finding('spelling', msg, start, end, re.sub(pattern, correction, word), text))
+                    
+                    if word not in self.tamil_words and not any(char.isdigit() for char in word):
+                        correction = self.best_correction(word, *self._neighbours(words, i))
+                        corrections.append(Finding('spelling', f'Unknown word: {word}', start, end, correction, text))
         
         return corrections
 
-    def check_grammar(self, text):
+    def check_grammar(self, text, sentences=None):
         corrections = []
-        sentences = self.split_sentences(text)
+        sentences = self._segment(text, sentences)
         
-        for sentence in sentences:
-            for pattern, error_msg, correction in self.grammar_rules['subject_verb_agreement']:
-                if re.search(pattern, sentence):
-                    corrected_sentence = re.sub(pattern, correction, sentence)
-                    corrections.append(('grammar', error_msg, sentence, corrected_sentence))
+        with timed('regex', 'Rule-based'):
+            for sentence in sentences:
+                token_starts = None
+                for error_msg, start, end, replacement in self._grammar_matcher.find_matches(sentence.text):
+                    # The finding covers every token the match overlaps: the token holding the suffix for
+                    # "A.*B" rules, possibly several for rules matched with a plain regex
+                    if token_starts is None:
+                        token_starts = [token.start for token in sentence.tokens]
+                    match_start, match_end = sentence.start + start, sentence.start + end
+                    first = sentence.tokens[bisect_right(token_starts, match_start) - 1]
+                    last = sentence.tokens[bisect_right(token_starts, max(match_start, match_end - 1)) - 1]
+                    correction = None
+                    if replacement is not None:
+                        correction = text[first.start:match_start] + replacement + text[match_end:last.end]
+                    corrections.append(Finding('grammar', error_msg, first.start, last.end, correction, text))
         
         return corrections
 
     def apply_corrections(self, text, corrections):
-        corrected_text = text
-        for _, _, original, correction in corrections:
-            if correction:
-                corrected_text = corrected_text.replace(original, correction)
-        return corrected_text
+        # All fixes are applied in one left-to-right pass over their spans. Of overlapping fixes the
+        # earlier start wins, then the longer span, then CORRECTION_PRIORITY, then the earlier finding
+        default_priority = len(CORRECTION_PRIORITY)
+        edits = sorted(
+            (finding.start, finding.start - finding.end, CORRECTION_PRIORITY.get(finding.kind, default_priority), order, finding)
+            for order, finding in enumerate(corrections)
+            if finding.correction
+        )
+
+        parts = []
+        position = 0
+        for start, _, _, _, finding in edits:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(finding.correction)
+            position = finding.end
+        parts.append(text[position:])
+        return ''.join(parts)
 
     def check_text(self, text):
-        spelling_corrections = self.check_spelling(text)
-        grammar_corrections = self.check_grammar(text)
+        # One segmentation pass feeds both checks
+        sentences = self._segment(text, None)
+        spelling_corrections = self.check_spelling(text, sentences)
+        grammar_corrections = self.check_grammar(text, sentences)
         all_corrections = spelling_corrections + grammar_corrections
         corrected_text = self.apply_corrections(text, all_corrections)
         return all_corrections, corrected_text
 
-def get_correction_suggestions(self, text):
-    try:
-        corrections = []
-        # Run spelling checks
-        spelling_corrections = self.check_spelling(text)
-        corrections.extend(spelling_corrections)
-        
-        # Run grammar checks
-        grammar_corrections = self.check_grammar(text)
-        corrections.extend(grammar_corrections)
-        
-        # Format corrections into suggestions
+    def check_texts(self, texts):
+        # Results are returned in input order
+        return [self.check_text(text) for text in texts]
+
+    @staticmethod
+    def format_suggestions(corrections):
         suggestions = []
-        for _, msg, original, correction in corrections:
-            if correction:
-                suggestions.append(f"{original} → {correction} ({msg})")
+        for finding in corrections:
+            if finding.correction:
+                suggestions.append(f"{finding.context} → {finding.correction} ({finding.message})")
             else:
-                suggestions.append(f"{original} ({msg})")
-        
+                suggestions.append(f"{finding.context} ({finding.message})")
         return suggestions
-    except Exception as e:
-        return [f"Error generating suggestions: {str(e)}"]
+
+    def get_correction_suggestions(self, text):
+        try:
+            corrections = []
+            sentences = self._segment(text, None)
+            # Run spelling checks
+            spelling_corrections = self.check_spelling(text, sentences)
+            corrections.extend(spelling_corrections)
+
+            # Run grammar checks
+            grammar_corrections = self.check_grammar(text, sentences)
+            corrections.extend(grammar_corrections)
+
+            # Format corrections into suggestions
+            return self.format_suggestions(corrections)
+        except Exception as e:
+            return [f"Error generating suggestions: {str(e)}"]
 
 
 # # Example usage:
@@ -0,0 +1,143 @@
+import re
+from collections import deque
+
+# Patterns made only of literal characters can go into the automaton
+LITERAL_PATTERN = re.compile(r'^[^\\.^$*+?{}\[\]|()]+$')
+# Agreement rules of the form "<subject>.*<verb suffix>"
+AGREEMENT_PATTERN = re.compile(r'^([^\\.^$*+?{}\[\]|()]+)\.\*([^\\.^$*+?{}\[\]|()]+)$')
+
+
+class AhoCorasick:
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first pass to set failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text):
+        # Yields (start, end, keyword index) for every occurrence, overlapping ones included
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self.keywords
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield position + 1 - len(keywords[index]), position + 1, index
+
+
+class SpellingRuleMatcher:
+    def __init__(self, rules):
+        # rules: list of (pattern, msg, correction); results keep the rule order
+        self.rules = list(rules)
+        literal_ids = [i for i, (pattern, _, _) in enumerate(self.rules) if LITERAL_PATTERN.match(pattern)]
+        keywords = sorted({self.rules[i][0] for i in literal_ids})
+        self._keyword_rules = {keyword: [] for keyword in keywords}
+        for i in literal_ids:
+            self._keyword_rules[self.rules[i][0]].append(i)
+        self._automaton = AhoCorasick(keywords)
+        literal_set = set(literal_ids)
+        self._regex_rules = [
+            (i, re.compile(pattern)) for i, (pattern, _, _) in enumerate(self.rules) if i not in literal_set
+        ]
+
+    def matching_rules(self, word):
+        hits = set()
+        keywords = self._automaton.keywords
+        for _, _, index in self._automaton.iter_matches(word):
+            hits.update(self._keyword_rules[keywords[index]])
+        for i, pattern in self._regex_rules:
+            if pattern.search(word):
+                hits.add(i)
+        return [self.rules[i] for i in sorted(hits)]
+
+
+class AgreementRuleMatcher:
+    def __init__(self, rules):
+        # rules: list of (pattern, msg, correction); "A.*B" rules are matched through the automaton
+        self.rules = list(rules)
+        self._compiled = [re.compile(pattern) for pattern, _, _ in self.rules]
+        self._pair_rules = {}
+        self._regex_rules = []
+        # For "A.*B" -> "A.*C" rules only the verb suffix changes, so a fix rewrites B to C in place
+        self._suffixes = {}
+        self._replacements = {}
+        keywords = set()
+        for i, (pattern, _, correction) in enumerate(self.rules):
+            match = AGREEMENT_PATTERN.match(pattern)
+            if match:
+                subject, suffix = match.groups()
+                keywords.update((subject, suffix))
+                self._pair_rules.setdefault(subject, {}).setdefault(suffix, []).append(i)
+                self._suffixes[i] = suffix
+                replacement = AGREEMENT_PATTERN.match(correction or '')
+                if replacement and replacement.group(1) == subject:
+                    self._replacements[i] = replacement.group(2)
+            else:
+                self._regex_rules.append(i)
+        self._automaton = AhoCorasick(sorted(keywords))
+
+    def _scan_line(self, line, spans, offset=0):
+        # A rule "A.*B" matches when some A ends at or before the start of some B;
+        # spans records where the last B of each matching rule starts, as in the greedy regex match
+        first_end = {}
+        last_start = {}
+        keywords = self._automaton.keywords
+        for start, end, index in self._automaton.iter_matches(line):
+            keyword = keywords[index]
+            if keyword not in first_end:
+                first_end[keyword] = end
+            last_start[keyword] = start
+
+        for subject, end in first_end.items():
+            suffix_rules = self._pair_rules.get(subject)
+            if not suffix_rules:
+                continue
+            for suffix, start in last_start.items():
+                if start >= end and suffix in suffix_rules:
+                    for i in suffix_rules[suffix]:
+                        spans.setdefault(i, offset + start)
+
+    def find_matches(self, sentence):
+        # (msg, start, end, replacement) per matching rule, with offsets into sentence; replacement is None
+        # when the rule's correction cannot be mapped onto the matched span
+        spans = {}
+        offset = 0
+        for line in sentence.split('\n'):
+            self._scan_line(line, spans, offset)
+            offset += len(line) + 1
+
+        matches = []
+        for i, start in spans.items():
+            suffix = self._suffixes[i]
+            matches.append((i, self.rules[i][1], start, start + len(suffix), self._replacements.get(i)))
+        for i in self._regex_rules:
+            match = self._compiled[i].search(sentence)
+            if match:
+                matches.append((i, self.rules[i][1], match.start(), match.end(), match.expand(self.rules[i][2])))
+        return [match[1:] for match in sorted(matches)]
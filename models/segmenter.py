@@ -0,0 +1,159 @@
+import re
+import string
+
+from models.graphemes import split_graphemes
+
+# The punctuation indicnlp's trivial tokenizer splits on, including the danda and double danda
+PUNCTUATION = string.punctuation + '।॥'
+SENTENCE_BOUNDARIES = '.!?।'
+# One pass over the text: numbers such as 3.14 or 10/12 stay whole, punctuation is a token of its own,
+# and everything else between whitespace is a word
+TOKEN_PATTERN = re.compile(
+    r'(?P<number>[0-9]+(?:[,.:/][0-9]+)+)'
+    r'|(?P<word>[^\s' + re.escape(PUNCTUATION) + r']+)'
+    r'|(?P<punct>[' + re.escape(PUNCTUATION) + r'])'
+)
+
+
+class Token:
+    __slots__ = ('text', 'start', 'end', 'kind')
+
+    def __init__(self, text, start, end, kind):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.kind = kind
+
+    def graphemes(self):
+        # (start, end, cluster) for every grapheme cluster, with offsets into the segmented text
+        spans = []
+        position = self.start
+        for cluster in split_graphemes(self.text):
+            spans.append((position, position + len(cluster), cluster))
+            position += len(cluster)
+        return spans
+
+    def __repr__(self):
+        return f"Token({self.text!r}, {self.start}, {self.end}, {self.kind!r})"
+
+
+class Sentence:
+    # start/end cover the first to the last word or number; boundary marks are tokens of the sentence they
+    # end, and marks before the first word of the text lead the first sentence
+    __slots__ = ('text', 'start', 'end', 'tokens')
+
+    def __init__(self, text, start, end, tokens):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+
+    def words(self):
+        return [token for token in self.tokens if token.kind != 'punct']
+
+    def __repr__(self):
+        return f"Sentence({self.text!r}, {self.start}, {self.end}, {len(self.tokens)} tokens)"
+
+
+class _Segmenter:
+    # Segments text that arrives in pieces, scanning every character once. Tokens never span whitespace, so
+    # only the run after the last whitespace of a piece can change with the next one ("3." + "14"); that run
+    # is carried over, and the text of the unfinished sentence is kept as a list of pieces
+    def __init__(self, max_buffer=None):
+        self.max_buffer = max_buffer
+        self.carry = ''
+        self.base = 0
+        self.tokens = []
+        self.sentence_start = self.sentence_end = None
+        self.parts = []
+        self.length = 0
+        # A finished sentence is held back until a word follows, so repeated marks ("...", "?!") join it
+        self.pending = None
+
+    def _close(self, text='', base=0):
+        # The current sentence; its text is the kept pieces followed by text (at offset base) up to its end
+        start, end = self.sentence_start, self.sentence_end
+        sentence_text = (''.join(self.parts) + text[max(0, start - base):max(0, end - base)])[:end - start]
+        sentence = Sentence(sentence_text, start, end, self.tokens)
+        self.tokens = []
+        self.sentence_start = self.sentence_end = None
+        self.parts = []
+        self.length = 0
+        return sentence
+
+    def feed(self, chunk, final=False):
+        # Yields the sentences completed by chunk; with final, everything that is left
+        text = self.carry + chunk
+        limit = len(text)
+        if not final:
+            while limit and not text[limit - 1].isspace():
+                limit -= 1
+            if not limit and (self.max_buffer is None or len(text) <= self.max_buffer):
+                self.carry = text
+                return
+
+        base = self.base
+        for match in TOKEN_PATTERN.finditer(text, 0, limit):
+            kind = match.lastgroup
+            start, end = match.span()
+            token = Token(match.group(), base + start, base + end, kind)
+            if kind == 'punct' and token.text in SENTENCE_BOUNDARIES:
+                if self.sentence_end is not None:
+                    self.tokens.append(token)
+                    self.pending = self._close(text, base)
+                elif self.pending is not None:
+                    self.pending.tokens.append(token)
+                else:
+                    self.tokens.append(token)
+                continue
+            if self.pending is not None:
+                yield self.pending
+                self.pending = None
+            self.tokens.append(token)
+            if self.sentence_start is None:
+                self.sentence_start = base + start
+            self.sentence_end = base + end
+
+        if self.sentence_start is not None:
+            piece = text[max(0, self.sentence_start - base):limit]
+            self.parts.append(piece)
+            self.length += len(piece)
+        self.carry = text[limit:]
+        self.base = base + limit
+
+        if final:
+            if self.pending is not None:
+                yield self.pending
+                self.pending = None
+            if self.sentence_start is not None:
+                yield self._close()
+            elif self.tokens:
+                # Only marks: an empty sentence that still carries them as tokens
+                position = self.tokens[0].start
+                yield Sentence('', position, position, self.tokens)
+                self.tokens = []
+        elif self.max_buffer is not None and self.length > self.max_buffer and self.sentence_start is not None:
+            if self.pending is not None:
+                yield self.pending
+                self.pending = None
+            yield self._close()
+
+
+def segment(text):
+    # Sentences with their tokens, all offsets into text
+    return list(_Segmenter().feed(text, final=True))
+
+
+def iter_sentences(chunks, max_buffer=2 ** 20):
+    # Streaming variant for large inputs: chunks is any iterable of strings (e.g. a file object);
+    # offsets are into the concatenated input and only the unfinished sentence is buffered.
+    # Text without a boundary for max_buffer characters is emitted as one sentence
+    segmenter = _Segmenter(max_buffer)
+    for chunk in chunks:
+        yield from segmenter.feed(chunk)
+    yield from segmenter.feed('', final=True)
+
+
+def tokenize(text):
+    return [token.text for sentence in segment(text) for token in sentence.tokens]
+
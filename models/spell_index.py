@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from itertools import combinations
+
+import Levenshtein
+
+from models.graphemes import split_graphemes
+from models.lexicon import _SortedPool, write_sections, map_sections
+
+# Bump whenever the binary layout changes
+INDEX_VERSION = 3
+MAGIC = b'TSPI'
+# Grapheme clusters are stored as one private-use character each, so distances run on plain strings
+CLUSTER_BASE = 0xE000
+UNKNOWN_CLUSTER = chr(0xF8FF)
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts', 'spelling')
+
+
+def _deletes(clusters, max_distance):
+    # Every variant with up to max_distance grapheme clusters removed
+    variants = set()
+    length = len(clusters)
+    for distance in range(min(max_distance, length) + 1):
+        for removed in combinations(range(length), distance):
+            removed = set(removed)
+            variants.add(''.join(c for i, c in enumerate(clusters) if i not in removed))
+    return variants
+
+
+def _variant_hash(variant):
+    # Variants are looked up by a 64-bit hash; a collision only adds a candidate that the distance check rejects
+    return int.from_bytes(hashlib.blake2b(variant.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def compile_spelling_index(words, output_path, max_distance=2):
+    # SymSpell-style deletion index over grapheme clusters: sorted variant hashes, each with the ids of the
+    # words that produce it; word ids follow the byte order of the word pool
+    words = sorted(set(words), key=lambda w: w.encode('utf-8'))
+    postings = {}
+    alphabet = {}
+    codes = bytearray()
+    code_offsets = array('I', [0])
+    for word_id, word in enumerate(words):
+        clusters = split_graphemes(word)
+        for variant in _deletes(clusters, max_distance):
+            postings.setdefault(_variant_hash(variant), []).append(word_id)
+        codes += ''.join(chr(CLUSTER_BASE + alphabet.setdefault(c, len(alphabet))) for c in clusters).encode('utf-8')
+        code_offsets.append(len(codes))
+    if len(alphabet) > ord(UNKNOWN_CLUSTER) - CLUSTER_BASE:
+        raise ValueError(f"{len(alphabet)} distinct grapheme clusters do not fit the private-use range")
+
+    keys = array('Q', sorted(postings))
+    posting_offsets = array('I', [0])
+    posting_ids = array('I')
+    for key in keys:
+        posting_ids.extend(postings[key])
+        posting_offsets.append(len(posting_ids))
+
+    pool = bytearray()
+    offsets = array('I', [0])
+    for word in words:
+        pool += word.encode('utf-8')
+        offsets.append(len(pool))
+
+    sections = [
+        ('keys', keys.tobytes()),
+        ('posting_offsets', posting_offsets.tobytes()),
+        ('postings', posting_ids.tobytes()),
+        ('offsets', offsets.tobytes()),
+        ('code_offsets', code_offsets.tobytes()),
+        ('pool', bytes(pool)),
+        ('codes', bytes(codes)),
+    ]
+    header = {'version': INDEX_VERSION, 'count': len(words), 'max_distance': max_distance, 'alphabet': list(alphabet)}
+    return write_sections(output_path, MAGIC, header, sections)
+
+
+class SpellingIndex:
+    def __init__(self, path):
+        # Memory-mapped, so every process that opens the same index shares its pages
+        self.path = path
+        self._mmap, header, section = map_sections(path, MAGIC, INDEX_VERSION)
+        self.max_distance = header['max_distance']
+        self._count = header['count']
+        self._keys = section('keys', 'Q')
+        self._posting_offsets = section('posting_offsets', 'I')
+        self._postings = section('postings', 'I')
+        self._words = _SortedPool(section('pool'), section('offsets', 'I'))
+        self._codes = section('codes')
+        self._code_offsets = section('code_offsets', 'I')
+        self._alphabet = {cluster: chr(CLUSTER_BASE + i) for i, cluster in enumerate(header['alphabet'])}
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def fingerprint(lexicon_path, max_distance):
+        # Lexicon files are named after their content, so their path, size and mtime identify the word list
+        stat = os.stat(lexicon_path)
+        payload = [INDEX_VERSION, max_distance, os.path.abspath(lexicon_path), stat.st_size, stat.st_mtime_ns]
+        return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def load_or_build(cls, lexicon, max_distance=2, index_dir=DEFAULT_INDEX_DIR):
+        try:
+            path = os.path.join(index_dir, f'spelling-v{INDEX_VERSION}-{cls.fingerprint(lexicon.path, max_distance)}.bin')
+            if not os.path.exists(path):
+                compile_spelling_index(lexicon, path, max_distance)
+        except OSError:
+            # A read-only deployment, or a lexicon that is not cached on disk, builds a private copy instead
+            return cls.from_words(lexicon, max_distance)
+        return cls(path)
+
+    @classmethod
+    def from_words(cls, words, max_distance=2):
+        # An index that is not cached on disk; the mapping outlives the deleted temporary file
+        fd, path = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        try:
+            compile_spelling_index(words, path, max_distance)
+            return cls(path)
+        finally:
+            os.remove(path)
+
+    def _candidates(self, variant):
+        key = _variant_hash(variant)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+        return ()
+
+    def suggest(self, word, top_k=5, max_distance=None):
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        clusters = split_graphemes(word)
+
+        candidates = set()
+        for variant in _deletes(clusters, max_distance):
+            candidates.update(self._candidates(variant))
+
+        ranked = []
+        codes = ''.join(self._alphabet.get(c, UNKNOWN_CLUSTER) for c in clusters)
+        offsets = self._code_offsets
+        for word_id in candidates:
+            candidate_codes = str(self._codes[offsets[word_id]:offsets[word_id + 1]], 'utf-8')
+            distance = Levenshtein.distance(codes, candidate_codes, score_cutoff=max_distance)
+            if distance <= max_distance:
+                # Ties on grapheme distance go to the closer code-point spelling, then alphabetical order
+                candidate = self._words[word_id].decode('utf-8')
+                ranked.append((distance, Levenshtein.distance(word, candidate), candidate))
+
+        ranked.sort()
+        return [(candidate, distance) for distance, _, candidate in ranked[:top_k]]
@@ -0,0 +1,209 @@
+# service.py
+import argparse
+import asyncio
+import contextlib
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from models.batcher import MicroBatcher
+from models.findings import Finding, to_records
+from models.metrics import stage_metrics, backends_to_prometheus, start_profiler_from_env
+from models.registry import registry, MODEL_TIMEOUTS
+
+# Per-model micro-batching: the vectorized ML checker takes large batches, the LLM small concurrent ones
+BATCH_SETTINGS = {
+    'Rule-based': {'max_batch_size': 64, 'max_delay': 0.002, 'workers': 2},
+    'ML': {'max_batch_size': 256, 'max_delay': 0.005, 'workers': 1},
+    'Deep-Learning': {'max_batch_size': 8, 'max_delay': 0.02, 'workers': 2},
+}
+MAX_QUEUE = 1024
+
+
+def _check_batch(model_name):
+    def check(texts):
+        model = registry.get(model_name)
+        if model_name == 'Rule-based':
+            return [
+                {'findings': to_records(corrections), 'suggestions': model.format_suggestions(corrections), 'corrected': corrected}
+                for corrections, corrected in model.check_texts(texts)
+            ]
+        if model_name == 'Deep-Learning':
+            return [
+                {'findings': to_records(findings), 'suggestions': "\n\n".join(finding.message for finding in findings)}
+                for findings in model.check_texts(texts)
+            ]
+        return [{'findings': to_records(findings), 'suggestions': None} for findings in model.check_texts(texts)]
+    return check
+
+
+class CheckingService:
+    def __init__(self, model_names=None, max_queue=MAX_QUEUE, timeouts=None):
+        self.model_names = model_names or registry.names()
+        self.timeouts = {**MODEL_TIMEOUTS, **(timeouts or {})}
+        self.batchers = {
+            name: MicroBatcher(_check_batch(name), max_queue=max_queue, name=name, **BATCH_SETTINGS.get(name, {}))
+            for name in self.model_names
+        }
+
+    async def start(self):
+        # Models are built before the first request so no caller pays for loading or training
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, registry.get, name) for name in self.model_names))
+        for batcher in self.batchers.values():
+            batcher.start()
+
+    async def stop(self):
+        await asyncio.gather(*(batcher.stop() for batcher in self.batchers.values()))
+
+    async def _check_one(self, model_name, text):
+        timeout = self.timeouts.get(model_name, 60)
+        try:
+            return await asyncio.wait_for(self.batchers[model_name].submit(text), timeout)
+        except asyncio.TimeoutError:
+            return {'findings': to_records([Finding.whole('timeout', f'No result within {timeout:g} seconds', text)]), 'suggestions': None}
+        except asyncio.QueueFull:
+            raise
+        except Exception as e:
+            return {'findings': to_records([Finding.whole('error', f'Error processing text: {str(e)}', text)]), 'suggestions': None}
+
+    def max_texts(self, model_names):
+        # A request larger than the smallest selected queue could never be admitted, however long it waits
+        return min(self.batchers[name].max_queue for name in model_names)
+
+    def _admit(self, model_names, count):
+        # Reject the whole request up front when any selected queue cannot take it
+        for name in model_names:
+            batcher = self.batchers[name]
+            if batcher.queue_depth() + count > batcher.max_queue:
+                raise asyncio.QueueFull(name)
+
+    async def check(self, texts, model_names):
+        self._admit(model_names, len(texts))
+        results = await asyncio.gather(*(
+            self._check_one(name, text) for text in texts for name in model_names
+        ))
+        per_text = len(model_names)
+        return [
+            dict(zip(model_names, results[i * per_text:(i + 1) * per_text]))
+            for i in range(len(texts))
+        ]
+
+    def stats(self):
+        return {
+            name: {'loaded': registry.is_loaded(name), **batcher.stats()}
+            for name, batcher in self.batchers.items()
+        }
+
+    def backend_metrics(self):
+        # Queue depth, counters and latency percentiles of the LLM backends; models that are not loaded
+        # yet are skipped rather than built
+        return {
+            name: registry.get(name).backend_metrics()
+            for name in self.batchers
+            if registry.is_loaded(name) and hasattr(registry.get(name), 'backend_metrics')
+        }
+
+
+def _error(message, status_code, headers=None):
+    return JSONResponse({'error': message}, status_code=status_code, headers=headers)
+
+
+def create_app(model_names=None, max_queue=MAX_QUEUE):
+    service = CheckingService(model_names, max_queue)
+
+    async def parse(request):
+        try:
+            payload = await request.json()
+        except ValueError:
+            return None, _error('Request body must be JSON', 400)
+        if not isinstance(payload, dict):
+            return None, _error('Request body must be a JSON object', 400)
+        model_names = payload.get('models')
+        if model_names is not None and not (
+            isinstance(model_names, list) and all(isinstance(name, str) for name in model_names)
+        ):
+            return None, _error("'models' must be a list of strings", 400)
+        model_names = model_names or service.model_names
+        unknown = [name for name in model_names if name not in service.batchers]
+        if unknown:
+            return None, _error(f"Unknown or disabled models: {', '.join(unknown)}", 400)
+        return (payload, model_names), None
+
+    async def run(texts, model_names):
+        if not all(isinstance(text, str) for text in texts):
+            return None, _error('Texts must be strings', 400)
+        limit = service.max_texts(model_names)
+        if len(texts) > limit:
+            # Retrying cannot help, so this is not a 503
+            return None, _error(f'At most {limit} texts per request; split the batch', 413)
+        try:
+            return await service.check(texts, model_names), None
+        except asyncio.QueueFull as e:
+            return None, _error(f'Queue for {e} is full, retry later', 503, {'Retry-After': '1'})
+
+    async def check(request):
+        parsed, error = await parse(request)
+        if error:
+            return error
+        payload, model_names = parsed
+        results, error = await run([payload.get('text')], model_names)
+        return error or JSONResponse({'results': results[0]})
+
+    async def check_batch(request):
+        parsed, error = await parse(request)
+        if error:
+            return error
+        payload, model_names = parsed
+        texts = payload.get('texts')
+        if not isinstance(texts, list):
+            return _error("'texts' must be a list of strings", 400)
+        results, error = await run(texts, model_names)
+        return error or JSONResponse({'results': results})
+
+    async def health(request):
+        return JSONResponse({'models': service.stats()})
+
+    async def metrics(request):
+        # Prometheus text exposition of the per-stage histograms and the LLM backends
+        body = stage_metrics.to_prometheus() + backends_to_prometheus(service.backend_metrics())
+        return PlainTextResponse(body, media_type='text/plain; version=0.0.4')
+
+    async def metrics_json(request):
+        return JSONResponse({'stages': stage_metrics.to_json(), 'models': service.stats(), 'backends': service.backend_metrics()})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await service.start()
+        yield
+        await service.stop()
+
+    app = Starlette(routes=[
+        Route('/check', check, methods=['POST']),
+        Route('/check/batch', check_batch, methods=['POST']),
+        Route('/health', health, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/metrics.json', metrics_json, methods=['GET']),
+    ], lifespan=lifespan)
+    app.state.service = service
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API for the Tamil checkers with warm models and micro-batching.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--models', nargs='+', choices=registry.names(), default=['Rule-based', 'ML'],
+                        help="Models to load and serve")
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE, help="Queued texts per model before requests get 503")
+    args = parser.parse_args()
+
+    # Only needed to run the server; create_app works under any ASGI server
+    import uvicorn
+    start_profiler_from_env()
+    uvicorn.run(create_app(args.models, args.max_queue), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
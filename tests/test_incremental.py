@@ -0,0 +1,43 @@
+from main import compare_models, iter_model_events
+from models.incremental import IncrementalChecker, SentenceResultCache
+from models.registry import registry
+
+
+def test_compare_models_matches_check_text_across_decimal_points():
+    text = 'நான் 3.14 கிலோ அரிசி வாங்குகிறான்'
+    expected, _ = registry.get('Rule-based').check_text(text)
+    results, _ = compare_models(text, ['Rule-based'])
+    assert any(finding.kind == 'grammar' for finding in expected)
+    assert results['Rule-based'] == expected
+
+
+def test_plan_splits_sentences_like_the_segmenter():
+    checker = IncrementalChecker(shared=SentenceResultCache())
+    text = 'நான் 3.14 கிலோ அரிசி வாங்குகிறான். அவன் வந்தான்...  சரி'
+    assert [entry[2] for entry in checker.plan('test', text)] == [
+        'நான் 3.14 கிலோ அரிசி வாங்குகிறான்.', 'அவன் வந்தான்...', 'சரி'
+    ]
+
+
+def test_scores_are_cached_with_the_findings():
+    checker = IncrementalChecker(shared=SentenceResultCache())
+    calls = []
+
+    def check_batch(sentences):
+        calls.append(list(sentences))
+        return [([], len(sentence)) for sentence in sentences]
+
+    text = 'அவன் வந்தான். நான் பள்ளிக்கு செல்கிறேன்.'
+    first = checker.check_scored('test', text, check_batch)
+    second = checker.check_scored('test', text + ' சரி', check_batch)
+    assert first[1] == [('அவன் வந்தான்.', 13), ('நான் பள்ளிக்கு செல்கிறேன்.', 26)]
+    assert second[1] == first[1] + [('சரி', 3)]
+    assert calls == [['அவன் வந்தான்.', 'நான் பள்ளிக்கு செல்கிறேன்.'], ['சரி']]
+
+
+def test_ml_confidence_comes_with_its_result():
+    text = 'அவள் புத்தகம் படிக்கிறாள். நான் பள்ளிக்கு செல்கிறேன்'
+    events = list(iter_model_events(text, ['ML']))
+    assert [kind for kind, _, _ in events] == ['confidence', 'result']
+    expected = registry.get('ML').check_texts_scored(['அவள் புத்தகம் படிக்கிறாள்.', 'நான் பள்ளிக்கு செல்கிறேன்'])
+    assert [score for _, score in events[0][2]] == [score for _, score in expected]
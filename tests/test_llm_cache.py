@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.groq_stub_server import start_server
+from models.deep_Learning_model import GemmaChecker, MODEL_NAME, SYSTEM_PROMPT, PROMPT_TEMPLATE, TEMPERATURE
+from models.llm_cache import ResponseCache, make_key
+
+
+def _checker(monkeypatch, latency):
+    server, url = start_server(latency=latency)
+    monkeypatch.setenv('GROQ_API_KEY', 'test')
+    return server, GemmaChecker(cache=ResponseCache(path=None), base_url=url)
+
+
+def test_identical_streams_in_flight_send_one_request(monkeypatch):
+    server, checker = _checker(monkeypatch, latency=0.3)
+    text = 'நான் பள்ளிக்கு செல்கிறேன்.'
+
+    def stream():
+        suggestion = checker.stream_suggestions(text)
+        return ''.join(suggestion)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        streamed = [executor.submit(stream) for _ in range(3)]
+        fetched = executor.submit(checker.get_suggestions, text)
+        texts = [future.result() for future in streamed] + [fetched.result()]
+    server.shutdown()
+
+    assert server.state.requests == 1
+    assert len(set(texts)) == 1 and not texts[0].startswith('Error')
+    assert checker.cache_stats()['deduplicated'] == 3
+
+
+def test_follower_of_an_abandoned_stream_gets_an_error(monkeypatch):
+    server, checker = _checker(monkeypatch, latency=0.3)
+    text = 'நான் பள்ளிக்கு செல்கிறேன்.'
+    leader = iter(checker.stream_suggestions(text))
+    follower = checker.stream_suggestions(text)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # The leader has claimed the key once it yields its first chunk
+        next(leader)
+        waiting = executor.submit(lambda: ''.join(follower))
+        deadline = time.monotonic() + 5
+        while checker.cache_stats()['deduplicated'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        leader.close()
+        assert waiting.result(timeout=5).startswith('Error')
+    server.shutdown()
+    assert checker.cache.get(make_key(MODEL_NAME, SYSTEM_PROMPT + PROMPT_TEMPLATE, TEMPERATURE, text)) is None
+
+
+def test_editing_one_sentence_resends_only_its_chunk(monkeypatch):
+    server, checker = _checker(monkeypatch, latency=0)
+    words = ['நான்', 'அவன்', 'பள்ளிக்கு', 'செல்கிறேன்', 'புத்தகம்', 'படிக்கிறாள்']
+    sentences = [' '.join(words[(i + j) % len(words)] for j in range(5)) + f' {i}.' for i in range(40)]
+    text = ' '.join(sentences)
+    chunks = len(checker.document_spans(text))
+    assert chunks > 3
+
+    checker.check_document(text)
+    assert server.state.requests == chunks
+    for edited in (0, 20, 39):
+        changed = list(sentences)
+        changed[edited] = changed[edited].replace(' ', ' ஆம் ', 1)
+        before = server.state.requests
+        checker.check_document(' '.join(changed))
+        # The edited chunk, plus the next one when the edit moves the cut point that ends it
+        assert 1 <= server.state.requests - before <= 2
+    server.shutdown()
@@ -0,0 +1,52 @@
+import os
+import threading
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import main
+from main import compare_models, iter_model_results
+from models.metrics import profiler
+from models.registry import registry
+
+
+class _HangingChecker:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def check_document(self, text):
+        self.release.wait()
+        return []
+
+
+def test_timed_out_llm_calls_do_not_hold_up_local_models():
+    text = 'நான் பள்ளிக்கு செல்கிறேன்.'
+    hanging = _HangingChecker()
+    registry.replace('Deep-Learning', hanging)
+    try:
+        # Every LLM worker is left holding a call that outlived its deadline
+        for _ in range(main.EXECUTOR_WORKERS['Deep-Learning'] + 2):
+            results = list(iter_model_results(text, ['Deep-Learning'], timeouts={'Deep-Learning': 0.01}))
+            assert results[0][1][0].kind == 'timeout'
+        results, _ = compare_models(text, ['Rule-based'], timeouts={'Rule-based': 5})
+        assert all(finding.kind != 'timeout' for finding in results['Rule-based'])
+    finally:
+        hanging.release.set()
+        registry.reset('Deep-Learning')
+
+
+def test_profiler_is_started_from_the_environment_once_per_process(monkeypatch):
+    starts = []
+    start = profiler.start
+    monkeypatch.setattr(profiler, 'start', lambda: (starts.append(None), start()))
+    monkeypatch.setenv('CHECKER_PROFILE', '1')
+    st.cache_resource.clear()
+    app = AppTest.from_file(os.path.join(os.path.dirname(main.__file__), 'main.py'), default_timeout=60)
+    try:
+        app.run()
+        assert profiler.is_running()
+        app.checkbox(key='profiler').uncheck().run()
+        app.run()
+        assert not profiler.is_running() and len(starts) == 1
+    finally:
+        profiler.stop()
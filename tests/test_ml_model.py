@@ -0,0 +1,14 @@
+import pytest
+
+from models.ML_model import OnlineStatisticalChecker
+
+
+def test_an_artifact_that_fails_to_load_is_not_trained_over(tmp_path):
+    path = OnlineStatisticalChecker(artifact_dir=str(tmp_path)).artifact_path()
+    with open(path, 'wb') as f:
+        f.write(b'not a joblib file')
+
+    with pytest.raises(RuntimeError, match='Cannot load'):
+        OnlineStatisticalChecker(artifact_dir=str(tmp_path))
+    with open(path, 'rb') as f:
+        assert f.read() == b'not a joblib file'
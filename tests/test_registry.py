@@ -0,0 +1,57 @@
+import threading
+import time
+
+from models.registry import ModelRegistry
+
+
+class _Model:
+    stale = False
+
+    def is_stale(self):
+        return self.stale
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_stale_model_is_rebuilt_without_blocking_get():
+    release = threading.Event()
+    builds = []
+
+    def build():
+        if builds:
+            release.wait(5)
+        builds.append(_Model())
+        return builds[-1]
+
+    registry = ModelRegistry({'ML': build})
+    first = registry.get('ML')
+    first.stale = True
+    # The request that notices the newer snapshot is served by the stale model while the rebuild runs
+    assert registry.get('ML') is first
+    assert registry.get('ML') is first
+    release.set()
+    assert _wait_for(lambda: registry.get('ML') is not first)
+    assert len(builds) == 2 and registry.generation('ML') == 1
+
+
+def test_failed_rebuild_is_logged_and_keeps_the_stale_model(caplog):
+    calls = []
+
+    def build():
+        calls.append(None)
+        if len(calls) > 1:
+            raise ValueError("corrupt snapshot")
+        return _Model()
+
+    registry = ModelRegistry({'ML': build})
+    first = registry.get('ML')
+    first.stale = True
+    assert registry.get('ML') is first
+    assert _wait_for(lambda: 'corrupt snapshot' in caplog.text)
+    assert 'Rebuilding the ML model failed' in caplog.text
+    assert registry.get('ML') is first
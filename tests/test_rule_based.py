@@ -0,0 +1,43 @@
+from models.rule_based_model import RuleBasedChecker
+from models.rule_matcher import AgreementRuleMatcher
+
+
+def _checker():
+    checker = RuleBasedChecker(lm_path=None)
+    checker.grammar_rules['subject_verb_agreement'].append(
+        (r'அவர்கள்\s+(\S+)கிறான்', 'Plural subject with singular verb', r'அவர்கள் \1கிறார்கள்')
+    )
+    checker._compile_rules()
+    return checker
+
+
+def test_regex_rule_finding_spans_the_whole_match():
+    checker = _checker()
+    text = 'அவர்கள் வருகிறான்'
+    findings = checker.check_grammar(text)
+    assert [(finding.start, finding.end, finding.correction) for finding in findings] == [
+        (0, len(text), 'அவர்கள் வருகிறார்கள்')
+    ]
+    assert checker.apply_corrections(text, findings) == 'அவர்கள் வருகிறார்கள்'
+
+
+def test_agreement_rule_rewrites_only_the_verb():
+    checker = RuleBasedChecker(lm_path=None)
+    text = 'அவள் புதிய புத்தகம் படிக்கிறான்.'
+    findings, corrected = checker.check_text(text)
+    assert [(finding.context, finding.correction) for finding in findings] == [('படிக்கிறான்', 'படிக்கிறாள்')]
+    assert corrected == 'அவள் புதிய புத்தகம் படிக்கிறாள்.'
+
+
+def test_find_matches_reports_regex_spans():
+    matcher = AgreementRuleMatcher([(r'அவர்கள்\s+(\S+)கிறான்', 'msg', r'அவர்கள் \1கிறார்கள்')])
+    assert matcher.find_matches('சரி. அவர்கள் வருகிறான்') == [('msg', 5, 22, 'அவர்கள் வருகிறார்கள்')]
+
+
+def test_word_lists_do_not_make_misspellings_valid_or_suggest_them():
+    checker = RuleBasedChecker(lm_path=None)
+    for misspelling, correct in [('சல்கிறேன்', 'செல்கிறேன்'), ('சல்கிறது', 'செல்கிறது'),
+                                 ('நன்பர்கள்', 'நண்பர்கள்'), ('அசிரியர்', 'ஆசிரியர்')]:
+        assert misspelling not in checker.tamil_words
+        assert checker.suggest_corrections(misspelling)[0] == (correct, 1)
+    assert checker.suggest_corrections('சல்கிறான்')[0] == ('செல்கிறான்', 1)
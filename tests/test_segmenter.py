@@ -0,0 +1,56 @@
+import time
+
+from models.segmenter import segment, tokenize, iter_sentences
+
+
+def test_repeated_boundary_marks_are_kept():
+    assert tokenize('ab...cd') == ['ab', '.', '.', '.', 'cd']
+    sentences = segment('ab...cd?!')
+    assert [sentence.text for sentence in sentences] == ['ab', 'cd']
+    assert [(token.text, token.start, token.end) for token in sentences[0].tokens] == [
+        ('ab', 0, 2), ('.', 2, 3), ('.', 3, 4), ('.', 4, 5)
+    ]
+    assert [token.text for token in sentences[1].tokens] == ['cd', '?', '!']
+
+
+def test_leading_marks_are_kept():
+    sentences = segment('?! அவன் வந்தான்.')
+    assert [(token.text, token.start) for token in sentences[0].tokens] == [
+        ('?', 0), ('!', 1), ('அவன்', 3), ('வந்தான்', 8), ('.', 15)
+    ]
+    assert sentences[0].text == 'அவன் வந்தான்'
+    assert tokenize('...') == ['.', '.', '.']
+
+
+def test_every_character_outside_whitespace_is_a_token():
+    text = 'நான் 3.14 கிலோ... சரி?! ஆம்'
+    tokens = [token for sentence in segment(text) for token in sentence.tokens]
+    assert ''.join(token.text for token in tokens) == text.replace(' ', '')
+    assert all(text[token.start:token.end] == token.text for token in tokens)
+
+
+def test_streaming_matches_whole_text():
+    text = 'நான் 3.14 கிலோ. அவன் வந்தான்... சரி?! ஆம்' * 20
+    expected = [[(token.text, token.start) for token in sentence.tokens] for sentence in segment(text)]
+    for size in (1, 4, 9):
+        chunks = (text[i:i + size] for i in range(0, len(text), size))
+        assert [[(token.text, token.start) for token in sentence.tokens] for sentence in iter_sentences(chunks)] == expected
+
+
+def test_streaming_long_text_without_boundaries_scans_once():
+    # One sentence per line with no final marks, as corpus files often are
+    lines = [f'நான் பள்ளிக்கு செல்கிறேன் வரி {i}\n' for i in range(20000)]
+    start = time.perf_counter()
+    sentences = list(iter_sentences(lines))
+    assert time.perf_counter() - start < 5
+    text = ''.join(lines)
+    assert [(s.text, s.start, s.end) for s in sentences] == [(s.text, s.start, s.end) for s in segment(text)]
+    assert len(sentences) == 1 and len(sentences[0].words()) == 5 * len(lines)
+
+
+def test_streaming_splits_text_without_boundaries_at_max_buffer():
+    lines = ['நான் பள்ளிக்கு செல்கிறேன்\n'] * 100
+    sentences = list(iter_sentences(lines, max_buffer=500))
+    assert len(sentences) > 1
+    assert sum(len(s.words()) for s in sentences) == 300
+    assert all(''.join(lines)[s.start:s.end] == s.text for s in sentences)
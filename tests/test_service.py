@@ -0,0 +1,57 @@
+from starlette.testclient import TestClient
+
+from benchmarks.groq_stub_server import start_server
+from models.deep_Learning_model import GemmaChecker
+from models.llm_cache import ResponseCache
+from models.registry import registry
+from service import create_app
+
+
+def _client(max_queue=4):
+    return TestClient(create_app(['Rule-based'], max_queue=max_queue))
+
+
+def test_batch_larger_than_the_queue_is_rejected_for_good():
+    with _client() as client:
+        response = client.post('/check/batch', json={'texts': ['நான் வந்தேன்'] * 5})
+        assert response.status_code == 413
+        assert 'Retry-After' not in response.headers
+        assert '4 texts' in response.json()['error']
+        assert client.post('/check/batch', json={'texts': ['நான் வந்தேன்'] * 4}).status_code == 200
+
+
+def test_models_must_be_a_list_of_strings():
+    with _client() as client:
+        for models in ('Rule-based', [1], {'Rule-based': True}):
+            response = client.post('/check', json={'text': 'நான் வந்தேன்', 'models': models})
+            assert response.status_code == 400
+            assert response.json()['error'] == "'models' must be a list of strings"
+        assert client.post('/check', json={'text': 'நான் வந்தேன்', 'models': ['Rule-based']}).status_code == 200
+
+
+def test_service_can_start_again_after_a_lifespan_restart():
+    app = create_app(['Rule-based'])
+    for _ in range(2):
+        with TestClient(app) as client:
+            response = client.post('/check', json={'text': 'நான் வந்தேன்'})
+            assert response.status_code == 200
+            assert all(finding['kind'] != 'error' for finding in response.json()['results']['Rule-based']['findings'])
+
+
+def test_metrics_export_the_llm_backend(monkeypatch):
+    server, url = start_server(latency=0)
+    monkeypatch.setenv('GROQ_API_KEY', 'test')
+    registry.replace('Deep-Learning', GemmaChecker(cache=ResponseCache(path=None), base_url=url))
+    try:
+        with TestClient(create_app(['Deep-Learning'])) as client:
+            assert client.post('/check', json={'text': 'நான் வந்தேன்.'}).status_code == 200
+            metrics = client.get('/metrics').text
+            backend = client.get('/metrics.json').json()['backends']['Deep-Learning']
+    finally:
+        registry.reset('Deep-Learning')
+        server.shutdown()
+
+    assert 'tamil_checker_backend_requests_total{checker="Deep-Learning"} 1' in metrics
+    assert 'tamil_checker_backend_queue_depth{checker="Deep-Learning"} 0' in metrics
+    assert 'tamil_checker_backend_latency_seconds{checker="Deep-Learning",quantile="0.99"}' in metrics
+    assert backend['requests'] == 1 and backend['latency_p50'] is not None
@@ -0,0 +1,38 @@
+import os
+
+import models.spell_index as spell_index
+from models.lexicon import compile_lexicon, Lexicon
+from models.spell_index import SpellingIndex
+
+
+def test_suggest_ranks_by_grapheme_distance():
+    index = SpellingIndex.from_words(['செல்கிறான்', 'செல்கிறாள்', 'படிக்கிறான்', 'புத்தகம்'])
+    assert index.suggest('செல்கிறன்') == [('செல்கிறான்', 1), ('செல்கிறாள்', 2)]
+    assert index.suggest('புத்தகம') == [('புத்தகம்', 1)]
+    assert index.suggest('அஅஅஅஅஅ') == []
+
+
+def test_load_or_build_reuses_the_index_of_the_same_lexicon_file(tmp_path, monkeypatch):
+    lexicon_path = compile_lexicon([('செல்கிறான்', 'VERB'), ('புத்தகம்', 'NOUN')], str(tmp_path / 'lexicon.bin'))
+    lexicon = Lexicon(lexicon_path)
+    index = SpellingIndex.load_or_build(lexicon, index_dir=str(tmp_path))
+    assert index.suggest('புத்தகம') == [('புத்தகம்', 1)]
+
+    # A warm start maps the existing file without reading the word list
+    def fail(*args, **kwargs):
+        raise AssertionError("index rebuilt")
+    monkeypatch.setattr(spell_index, 'compile_spelling_index', fail)
+    monkeypatch.setattr(Lexicon, '__iter__', fail)
+    again = SpellingIndex.load_or_build(lexicon, index_dir=str(tmp_path))
+    assert again.path == index.path and os.path.exists(again.path)
+    assert again.suggest('செல்கிறன்') == [('செல்கிறான்', 1)]
+
+
+def test_unwritable_artifact_dirs_fall_back_to_private_copies(tmp_path):
+    # A directory path under a regular file can never be created, whoever runs the test
+    blocked = tmp_path / 'file'
+    blocked.write_text('')
+    lexicon = Lexicon.load_or_compile(sources=[], extra_entries=[('புத்தகம்', 'NOUN')], lexicon_dir=str(blocked / 'lexicon'))
+    assert 'புத்தகம்' in lexicon and not os.path.exists(lexicon.path)
+    index = SpellingIndex.load_or_build(lexicon, index_dir=str(blocked / 'spelling'))
+    assert index.suggest('புத்தகம') == [('புத்தகம்', 1)]